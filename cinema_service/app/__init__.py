@@ -3,8 +3,9 @@ from flask import Flask, request, jsonify, redirect, render_template, url_for, s
 from flask_jwt_extended import JWTManager, verify_jwt_in_request, jwt_required, decode_token
 from mongoengine import connect
 from flask_session import Session
-from flask_graphql import GraphQLView
 from app.schemas import schema
+from app.schemas.documents import document_cache
+from app.operations import execute_operation
 from app.routes import cinemas_bp, movies_bp, users_bp, actors_bp
 from datetime import datetime
 from flask_cors import CORS
@@ -14,8 +15,18 @@ from dotenv import load_dotenv
 from app.config import Config
 from flask_mail import Mail
 from app.forms import AddAdminForm
-from flask_socketio import SocketIO, emit
+from flask_socketio import SocketIO, emit, join_room, leave_room
 from .util.scheduler import start_scheduler
+from .util.query_counter import QueryCounter, log_round_trips
+from .util.realtime import cinema_room, showtime_room
+from .util.socket_queue import socketio_options
+from .util.persisted_queries import PersistedQueryView
+from .util.query_budget import QueryBudget
+from .util.response_cache import configure_response_cache, get_response_cache
+from .util.hot_documents import start_watchers, hot_cache_stats
+from .util.single_flight import configure_single_flight, single_flight_stats
+from .util.indexes import index_health, start_index_build
+from .schemas.sampling import configure_sample_pool
 from flask_wtf.csrf import CSRFProtect, validate_csrf
 socketio = SocketIO()
 
@@ -23,7 +34,11 @@ def create_app():
     load_dotenv()
     app = Flask(__name__)
     app.config.from_object(Config)
-    socketio.init_app(app)
+    socketio.init_app(
+        app,
+        async_mode=app.config.get('SOCKETIO_ASYNC_MODE'),
+        **socketio_options(app.config.get('SOCKETIO_MESSAGE_QUEUE'))
+    )
     mail = Mail(app)
     mail.init_app(app)
     csrf = CSRFProtect(app)
@@ -38,8 +53,10 @@ def create_app():
     
     MONGO_URI = os.environ.get('MONGO_URI')
     try:
-        connect(db='cinemacollection',host=MONGO_URI, alias='default')
+        connect(db='cinemacollection',host=MONGO_URI, alias='default', event_listeners=[QueryCounter()])
         print("MongoDB connection successful!")
+        start_watchers()
+        start_index_build()
     except Exception as e:
         print(f"Error connecting to MongoDB: {e}")
     
@@ -86,15 +103,8 @@ def create_app():
             username = form.username.data
             password = form.password.data
 
-            mutation_query = f"""
-                mutation {{
-                    createAdmin(username: "{username}",  password: "{password}") {{
-                        ok
-                    }}
-                }}
-            """
             try:
-                result = schema.execute(mutation_query)
+                result = execute_operation('createAdmin', {'username': username, 'password': password})
                 if result.errors:
                     print(result.errors)
                     flash('Failed to add admin.', 'error')
@@ -106,6 +116,16 @@ def create_app():
 
         return render_template('/admin/add_admin.html', form=form)
     
+    configure_response_cache(app.config['RESPONSE_CACHE_URL'], app.config['RESPONSE_CACHE_SECONDS'])
+    configure_single_flight(name.strip() for name in app.config['SINGLE_FLIGHT'] if name.strip())
+    configure_sample_pool(app.config['RANDOM_MOVIE_POOL_SIZE'])
+    budget = QueryBudget(
+        app.config['GRAPHQL_MAX_COST'],
+        app.config['GRAPHQL_MAX_DEPTH'],
+        app.config['GRAPHQL_COST_PER_MINUTE']
+    )
+    graphql_view = PersistedQueryView.as_view('graphql_view', schema=schema, backend=document_cache, budget=budget)
+
     @app.route('/cinema-service/graphql', methods=['GET', 'POST', 'OPTIONS'])
     @csrf.exempt
     def graphql():
@@ -117,8 +137,22 @@ def create_app():
             response.headers.add('Access-Control-Allow-Credentials', 'true')
             return response
         else:
-            view = GraphQLView.as_view('graphql', schema=schema)
-            return view()
+            payload = request.get_json(silent=True) or {}
+            operation_name = payload.get('operationName') if isinstance(payload, dict) else None
+            return log_round_trips(operation_name or request.args.get('operationName'), graphql_view())
+
+    @app.route('/cinema-service/metrics', methods=['GET'])
+    def metrics():
+        return jsonify({
+            'response_cache': get_response_cache().stats(),
+            'hot_documents': hot_cache_stats(),
+            'single_flight': single_flight_stats(),
+        })
+
+    @app.route('/cinema-service/health', methods=['GET'])
+    def health():
+        status = index_health()
+        return jsonify(status), 200 if status['status'] == 'ok' else 503
 
     @app.route('/cinema-service/login', methods=['GET', 'POST'])
     @csrf.exempt
@@ -136,24 +170,7 @@ def create_app():
             username = request.form.get('username', None)
             password = request.form.get('password', None)
 
-            query = '''
-            mutation login($username: String!, $password: String!) {
-                loginAdmin(username: $username, password: $password) {
-                    ok
-                    auth {
-                        accessToken
-                    }
-                    message
-                }
-            }
-            '''
-
-            variables = {
-                'username': username,
-                'password': password
-            }
-
-            result = schema.execute(query, variables=variables)
+            result = execute_operation('loginAdmin', {'username': username, 'password': password})
             if result.errors:
                 return jsonify({'errors': [str(error) for error in result.errors]}), 401
 
@@ -183,4 +200,23 @@ def create_app():
 
 @socketio.on('connect')
 def handle_connect():
-    emit('message', {'data': 'Connected to the server'})
\ No newline at end of file
+    emit('message', {'data': 'Connected to the server'})
+
+@socketio.on('subscribe')
+def handle_subscribe(data):
+    for room in socket_rooms(data):
+        join_room(room)
+
+@socketio.on('unsubscribe')
+def handle_unsubscribe(data):
+    for room in socket_rooms(data):
+        leave_room(room)
+
+def socket_rooms(data):
+    data = data if isinstance(data, dict) else {}
+    rooms = []
+    if data.get('cinema_id'):
+        rooms.append(cinema_room(data['cinema_id']))
+    if data.get('showtime_id'):
+        rooms.append(showtime_room(data['showtime_id']))
+    return rooms
\ No newline at end of file
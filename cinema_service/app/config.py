@@ -12,4 +12,13 @@ class Config:
     MAIL_USERNAME = os.getenv('MAIL_USERNAME')
     MAIL_PASSWORD = os.getenv('MAIL_PASSWORD')
     MAIL_DEFAULT_SENDER = os.getenv('MAIL_USERNAME')
-    RECAPTCHA_PUBLIC_KEY = os.getenv('RECAPTCHA_PUBLIC_KEY')
\ No newline at end of file
+    RECAPTCHA_PUBLIC_KEY = os.getenv('RECAPTCHA_PUBLIC_KEY')
+    SOCKETIO_MESSAGE_QUEUE = os.getenv('SOCKETIO_MESSAGE_QUEUE')
+    SOCKETIO_ASYNC_MODE = os.getenv('SOCKETIO_ASYNC_MODE')
+    GRAPHQL_MAX_COST = int(os.getenv('GRAPHQL_MAX_COST', 5000))
+    GRAPHQL_MAX_DEPTH = int(os.getenv('GRAPHQL_MAX_DEPTH', 10))
+    GRAPHQL_COST_PER_MINUTE = int(os.getenv('GRAPHQL_COST_PER_MINUTE', 50000))
+    RESPONSE_CACHE_URL = os.getenv('RESPONSE_CACHE_URL')
+    RESPONSE_CACHE_SECONDS = int(os.getenv('RESPONSE_CACHE_SECONDS', 300))
+    RANDOM_MOVIE_POOL_SIZE = int(os.getenv('RANDOM_MOVIE_POOL_SIZE', 0))
+    SINGLE_FLIGHT = os.getenv('SINGLE_FLIGHT', 'graphql,movies,cinemas,scheduleItem,schedules').split(',')
@@ -1,6 +1,12 @@
 from mongoengine import StringField,ListField,ReferenceField,Document
+from ..util.search import SEARCH_INDEXES, build_keywords
 
 class ActorModel(Document):
-    meta = {'collection': 'actors'}
+    meta = {'collection': 'actors', 'indexes': SEARCH_INDEXES}
+    search_fields = ('name',)
     name = StringField(required=True, unique=True)
-    movies = ListField(ReferenceField('MovieModel'))
\ No newline at end of file
+    movies = ListField(ReferenceField('MovieModel'))
+    search_keywords = ListField(StringField())
+
+    def clean(self):
+        self.search_keywords = build_keywords(self.name)
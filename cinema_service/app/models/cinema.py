@@ -1,6 +1,7 @@
 from mongoengine import Document, StringField, IntField, FloatField, ListField,\
 EmbeddedDocument, EmbeddedDocumentField, ValidationError,EmbeddedDocumentListField
 from .seat import SeatGroup
+from ..util.search import SEARCH_INDEXES, build_keywords
 
 class WorkingDay(EmbeddedDocument):
     day = StringField(required=True, choices=["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"])
@@ -8,27 +9,23 @@ class WorkingDay(EmbeddedDocument):
     end_time = StringField(required=True)
 
 class CinemaModel(Document):
-    meta = {'collection': 'cinemas'}
+    # Not strict while documents written before util/migrate_ratings.py still
+    # carry the legacy `rating`/`ratedBy` fields.
+    meta = {'collection': 'cinemas', 'indexes': SEARCH_INDEXES, 'strict': False}
+    search_fields = ('name', 'location')
+    derived_fields = {'rating': ('rating_sum', 'rating_count')}
     name = StringField(required=True)
     location = StringField(required=True)
-    rating = FloatField(default=0.0)
+    rating_sum = FloatField(default=0.0)
+    rating_count = IntField(default=0)
     imageUrl = StringField()
-    ratedBy = ListField(StringField())
     working_days = ListField(EmbeddedDocumentField(WorkingDay))
     seat_groups = EmbeddedDocumentListField(SeatGroup)
-    
-    def update_rating(self, new_rating, user_id):
-        if user_id in self.ratedBy:
-            raise Exception("You have already rated this cinema.")
-
-        current_rating = self.rating if self.rating else 0.0
-        total_ratings = len(self.ratedBy) if hasattr(self, 'ratedBy') else 0
-        new_total_ratings = total_ratings + 1
-        new_avg_rating = (current_rating * total_ratings + new_rating) / new_total_ratings
-        self.rating = new_avg_rating
-        self.ratedBy.append(user_id)
-        self.save()
+    search_keywords = ListField(StringField())
 
+    def clean(self):
+        self.search_keywords = build_keywords(self.name, self.location)
+    
     def add_working_day(self, day, start_time, end_time):
         if any(work_day.day == day for work_day in self.working_days):
             raise ValidationError(f"{day} is already added as a working day.")
@@ -0,0 +1,40 @@
+from mongoengine import Document, StringField, FloatField, ObjectIdField
+from bson import ObjectId
+import time
+
+# Comments live in their own collection instead of a list inside the movie, so
+# adding one is a single insert and a movie page reads only the comments it
+# shows. Newest first, paged on (timestamp, _id) along the index below.
+class CommentModel(Document):
+    meta = {
+        'collection': 'comments',
+        'indexes': [
+            ('movie_id', '-timestamp', '-id'),
+        ]
+    }
+    movie_id = ObjectIdField(required=True)
+    username = StringField(required=True)
+    content = StringField(required=True)
+    timestamp = FloatField(required=True)
+
+    @staticmethod
+    def add(movie_id, username, content):
+        return CommentModel(movie_id=ObjectId(movie_id), username=username, content=content, timestamp=time.time()).save(force_insert=True)
+
+    @staticmethod
+    def page(movie_id, size, after=None):
+        # `after` is the (timestamp, id) of the last comment already shown.
+        query = CommentModel.objects(movie_id=movie_id)
+        if after is not None:
+            timestamp, comment_id = after
+            query = query.filter(
+                __raw__={'$or': [
+                    {'timestamp': {'$lt': timestamp}},
+                    {'timestamp': timestamp, '_id': {'$lt': comment_id}},
+                ]}
+            )
+        return list(query.order_by('-timestamp', '-id').limit(size))
+
+    @staticmethod
+    def count(movie_id):
+        return CommentModel._get_collection().count_documents({'movie_id': ObjectId(movie_id)})
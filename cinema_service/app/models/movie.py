@@ -1,38 +1,26 @@
-from mongoengine import Document, StringField, IntField, ListField,FloatField,EmbeddedDocument,EmbeddedDocumentField,ReferenceField
-import time
+from mongoengine import Document, StringField, IntField, ListField,FloatField,ReferenceField
+from ..util.search import SEARCH_INDEXES, build_keywords
 from .actor import ActorModel
 
-class Comment(EmbeddedDocument):
-    username = StringField(required=True)
-    content = StringField(required=True)
-    timestamp = FloatField(required=True)
-    
 class MovieModel(Document):
-    meta = {'collection': 'movies'}
+    # Not strict while documents written before util/migrate_ratings.py and
+    # util/migrate_comments.py still carry the legacy `rating`/`ratedBy`
+    # fields and the embedded `comments` list. Genre filters compare whole
+    # genre names, as listed in the frontend, so they can use the `genres` index.
+    meta = {'collection': 'movies', 'indexes': SEARCH_INDEXES + ['genres', ('actors', '-id')], 'strict': False}
+    search_fields = ('title',)
+    derived_fields = {'rating': ('rating_sum', 'rating_count')}
     title = StringField(required=True)
     genres = ListField(StringField(), required=True)
     duration = IntField(required=True)
     poster_url = StringField()
     video_url = StringField()
     description = StringField()
-    rating = FloatField(default=0.0)
-    ratedBy = ListField(StringField())
-    comments = ListField(EmbeddedDocumentField(Comment))
+    rating_sum = FloatField(default=0.0)
+    rating_count = IntField(default=0)
     actors = ListField(ReferenceField(ActorModel))
-    
-    def update_rating(self, new_rating, user_id):
-        if user_id in self.ratedBy:
-            raise Exception("You have already rated this movie.")
+    search_keywords = ListField(StringField())
+
+    def clean(self):
+        self.search_keywords = build_keywords(self.title)
 
-        current_rating = self.rating if self.rating else 0.0
-        total_ratings = len(self.ratedBy) if hasattr(self, 'ratedBy') else 0
-        new_total_ratings = total_ratings + 1
-        new_avg_rating = (current_rating * total_ratings + new_rating) / new_total_ratings
-        self.rating = new_avg_rating
-        self.ratedBy.append(user_id)
-        self.save()
-        
-    def add_comment(self, username, content):
-        comment = Comment(username=username, content=content, timestamp=time.time())
-        self.comments.append(comment)
-        self.save()
@@ -0,0 +1,32 @@
+from mongoengine import Document, StringField, DateTimeField
+from datetime import datetime
+
+PERSISTED_QUERY_DAYS = 30
+
+# Query text for automatic persisted queries, keyed by its sha256 hash so every
+# worker behind the load balancer can resolve a hash registered on another one.
+# Entries expire 30 days after registration, however often they are used;
+# clients simply re-register them on the next miss.
+class PersistedQuery(Document):
+    meta = {
+        'collection': 'persisted_queries',
+        'indexes': [
+            {'fields': ['created_at'], 'expireAfterSeconds': PERSISTED_QUERY_DAYS * 24 * 60 * 60},
+        ]
+    }
+    id = StringField(primary_key=True)
+    query = StringField(required=True)
+    created_at = DateTimeField(required=True)
+
+    @staticmethod
+    def lookup(query_hash):
+        document = PersistedQuery._get_collection().find_one({'_id': query_hash}, {'query': 1})
+        return document['query'] if document else None
+
+    @staticmethod
+    def store(query_hash, query):
+        PersistedQuery._get_collection().update_one(
+            {'_id': query_hash},
+            {'$setOnInsert': {'query': query, 'created_at': datetime.utcnow()}},
+            upsert=True
+        )
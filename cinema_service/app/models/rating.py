@@ -0,0 +1,68 @@
+from mongoengine import Document, StringField, FloatField, ObjectIdField, DateTimeField
+from pymongo.errors import DuplicateKeyError, PyMongoError
+from bson import ObjectId
+from datetime import datetime
+
+RATING_TARGETS = ('movie', 'cinema')
+
+# One document per (target, user). The unique index is what makes a rating
+# count at most once: of any number of concurrent attempts by the same user
+# exactly one insert succeeds, and only that one bumps the running sum and
+# count kept on the rated movie or cinema.
+class Rating(Document):
+    meta = {
+        'collection': 'ratings',
+        'indexes': [
+            {'fields': ['target_type', 'target_id', 'user_id'], 'unique': True},
+        ]
+    }
+    target_type = StringField(required=True, choices=RATING_TARGETS)
+    target_id = ObjectIdField(required=True)
+    user_id = StringField(required=True)
+    value = FloatField(required=True)
+    created_at = DateTimeField(required=True)
+
+    @staticmethod
+    def rate(model, target_type, target_id, user_id, value):
+        # Returns None when the target does not exist, False when the user has
+        # already rated it and True once the rating has been counted.
+        if not ObjectId.is_valid(str(target_id)):
+            return None
+        target_id = ObjectId(target_id)
+        collection = model._get_collection()
+        # Until util/migrate_ratings.py has run, earlier raters are only listed
+        # in the legacy `ratedBy` array and have no rating document yet.
+        if collection.count_documents({'_id': target_id, 'ratedBy': {'$ne': user_id}}, limit=1) == 0:
+            return False if collection.count_documents({'_id': target_id}, limit=1) else None
+        try:
+            inserted = Rating._get_collection().insert_one({
+                'target_type': target_type,
+                'target_id': target_id,
+                'user_id': user_id,
+                'value': value,
+                'created_at': datetime.utcnow(),
+            })
+        except DuplicateKeyError:
+            return False
+        try:
+            collection.update_one(
+                {'_id': target_id},
+                {'$inc': {'rating_sum': value, 'rating_count': 1}}
+            )
+        except PyMongoError:
+            # A rating that was never counted must not block the user from
+            # rating again, so it is taken back before the error propagates.
+            Rating._get_collection().delete_one({'_id': inserted.inserted_id})
+            raise
+        return True
+
+    @staticmethod
+    def has_rated(target_type, target_id, user_id):
+        return Rating._get_collection().find_one(
+            {'target_type': target_type, 'target_id': ObjectId(target_id), 'user_id': user_id},
+            {'_id': 1}
+        ) is not None
+
+def average_rating(document):
+    count = document.rating_count or 0
+    return (document.rating_sum or 0.0) / count if count else 0.0
@@ -17,14 +17,8 @@ class ScheduleDay(EmbeddedDocument):
     day = StringField(required=True)
     schedule_items = ListField(EmbeddedDocumentField(ScheduleItem))
 
+# Legacy per-cinema layout. Showtimes now live in their own collection
+# (see models/showtime.py); this model is only read by util/migrate_showtimes.py.
 class Schedule(Document):
     cinema_id = StringField(required=True, unique=True)
     schedule_days = ListField(EmbeddedDocumentField(ScheduleDay))
-
-    @staticmethod
-    def create_cinema_schedule(cinema_id):
-        days = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-        schedule_days = [ScheduleDay(day=day, schedule_items=[]) for day in days]
-        schedule = Schedule(cinema_id=cinema_id, schedule_days=schedule_days)
-        schedule.save()
-        return schedule
\ No newline at end of file
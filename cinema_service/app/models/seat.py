@@ -1,7 +1,9 @@
-from mongoengine import IntField, BooleanField, EmbeddedDocument, StringField,EmbeddedDocumentField, ListField
+from mongoengine import IntField, BooleanField, EmbeddedDocument, StringField,EmbeddedDocumentField, ListField, LongField, ValidationError
 from graphene_mongo import MongoengineObjectType
 from graphene import List
 
+WORD_BITS = 63
+
 class Seat(EmbeddedDocument):
     row = IntField(required=True)
     column = IntField(required=True)
@@ -13,6 +15,81 @@ class SeatGroup(EmbeddedDocument):
     rows = IntField(required=True)       
     columns = IntField(required=True)
     seats = ListField(EmbeddedDocumentField(Seat)) 
+
+# Occupancy of one seat group of a showtime as a row-major bitmap of int64
+# words: each row takes `row_words` words of WORD_BITS seats, so seat
+# (row, column) is bit (column - 1) % WORD_BITS of word
+# (row - 1) * row_words + (column - 1) // WORD_BITS. `layout` marks the seats
+# that exist in the hall, `taken` the ones that are booked. A seat lookup is a
+# shift and a mask, and a whole booking is checked with one AND per word.
+class SeatMap(EmbeddedDocument):
+    group_name = StringField(required=True)
+    rows = IntField(required=True)
+    columns = IntField(required=True)
+    row_words = IntField(default=1)
+    layout = ListField(LongField())
+    taken = ListField(LongField())
+
+    @staticmethod
+    def from_seat_group(group):
+        invalid = [seat for seat in group.seats if seat.row < 1 or seat.column < 1]
+        if invalid:
+            raise ValidationError(f"Seat group {group.group_name} has seats outside the hall: " + ', '.join(f"{seat.row}/{seat.column}" for seat in invalid))
+        rows = max([group.rows or 0] + [seat.row for seat in group.seats])
+        columns = max([group.columns or 0] + [seat.column for seat in group.seats])
+        seat_map = SeatMap(group_name=group.group_name, rows=rows, columns=columns, row_words=max(1, -(-columns // WORD_BITS)))
+        layout = [0] * (rows * seat_map.row_words)
+        taken = [0] * len(layout)
+        for seat in group.seats:
+            word, bit = seat_map.position(seat.row, seat.column)
+            layout[word] |= bit
+            if seat.is_taken:
+                taken[word] |= bit
+        seat_map.layout = layout
+        seat_map.taken = taken
+        return seat_map
+
+    def position(self, row, column):
+        return (row - 1) * self.row_words + (column - 1) // WORD_BITS, 1 << (column - 1) % WORD_BITS
+
+    def in_range(self, row, column):
+        return 1 <= row <= self.rows and 1 <= column <= self.row_words * WORD_BITS
+
+    def row_masks(self, seats):
+        masks = {}
+        for seat in seats:
+            word, bit = self.position(seat.row, seat.column)
+            masks[word] = masks.get(word, 0) | bit
+        return masks
+
+    def exists(self, row, column):
+        if not self.in_range(row, column):
+            return False
+        word, bit = self.position(row, column)
+        return word < len(self.layout) and bool(self.layout[word] & bit)
+
+    def is_taken(self, row, column):
+        word, bit = self.position(row, column)
+        return bool(self.taken[word] & bit)
+
+    def unavailable_seats(self, seats):
+        if all(self.in_range(seat.row, seat.column) for seat in seats):
+            masks = self.row_masks(seats)
+            if all(
+                word < len(self.layout) and self.layout[word] & mask == mask and not self.taken[word] & mask
+                for word, mask in masks.items()
+            ):
+                return []
+        return [seat for seat in seats if not self.exists(seat.row, seat.column) or self.is_taken(seat.row, seat.column)]
+
+    def to_seat_group(self, expand=True):
+        seats = [
+            Seat(row=row, column=column, is_taken=self.is_taken(row, column), seatGroup=self.group_name)
+            for row in range(1, self.rows + 1)
+            for column in range(1, self.row_words * WORD_BITS + 1)
+            if self.exists(row, column)
+        ] if expand else []
+        return SeatGroup(group_name=self.group_name, rows=self.rows, columns=self.columns, seats=seats)
     
 class SeatType(MongoengineObjectType):
     class Meta:
@@ -21,4 +98,4 @@ class SeatType(MongoengineObjectType):
 class SeatGroupType(MongoengineObjectType):
     class Meta:
         model = SeatGroup
-    seats = List(SeatType)
\ No newline at end of file
+    seats = List(SeatType)
@@ -0,0 +1,114 @@
+from mongoengine import Document, ObjectIdField, StringField, IntField, DateTimeField
+from pymongo import DeleteMany, UpdateOne
+from pymongo.errors import BulkWriteError
+from datetime import datetime, timedelta, timezone
+from .seat import Seat
+
+HOLD_MINUTES = 10
+DUPLICATE_KEY = 11000
+
+# One document per held seat. The unique index makes two users racing for the
+# same seat fail on insert, and the TTL index lets MongoDB drop expired holds
+# on its own; queries still compare expires_at because the TTL monitor only
+# runs about once a minute. Times are naive UTC, which is what the TTL monitor
+# compares against; the expiry handed back to clients is marked as UTC.
+class SeatHold(Document):
+    meta = {
+        'collection': 'seat_holds',
+        'indexes': [
+            {'fields': ['showtime_id', 'seat_group', 'row', 'column'], 'unique': True},
+            ('showtime_id', 'user_id'),
+            {'fields': ['expires_at'], 'expireAfterSeconds': 0},
+        ]
+    }
+    showtime_id = ObjectIdField(required=True)
+    user_id = StringField(required=True)
+    seat_group = StringField(required=True)
+    row = IntField(required=True)
+    column = IntField(required=True)
+    expires_at = DateTimeField(required=True)
+
+    @staticmethod
+    def seat_filter(showtime_id, seats):
+        return {
+            'showtime_id': showtime_id,
+            '$or': [{'seat_group': seat.seatGroup, 'row': seat.row, 'column': seat.column} for seat in seats]
+        }
+
+    @staticmethod
+    def held_by_others(showtime_id, seats, user_id=None):
+        query = SeatHold.seat_filter(showtime_id, seats)
+        query['expires_at'] = {'$gt': datetime.utcnow()}
+        if user_id:
+            query['user_id'] = {'$ne': user_id}
+        held = {
+            (hold['seat_group'], hold['row'], hold['column'])
+            for hold in SeatHold._get_collection().find(query, {'seat_group': 1, 'row': 1, 'column': 1})
+        }
+        return [seat for seat in seats if (seat.seatGroup, seat.row, seat.column) in held]
+
+    @staticmethod
+    def hold(showtime_id, user_id, seats):
+        # Upserts keyed on the user: the user's own holds are extended, while a
+        # seat held by someone else hits the unique index and is reported back.
+        # Holds are all-or-nothing, so a partial hold is undone again: seats
+        # this call newly held are released and extended holds get back their
+        # previous expiry, leaving the user's earlier holds as they were.
+        now = datetime.utcnow()
+        collection = SeatHold._get_collection()
+        collection.delete_many({'showtime_id': showtime_id, 'expires_at': {'$lte': now}})
+        expires_at = now + timedelta(minutes=HOLD_MINUTES)
+        query = SeatHold.seat_filter(showtime_id, seats)
+        query['user_id'] = user_id
+        previous = {hold['_id']: hold['expires_at'] for hold in collection.find(query, {'expires_at': 1})}
+        requests = [
+            UpdateOne(
+                {'showtime_id': showtime_id, 'seat_group': seat.seatGroup, 'row': seat.row, 'column': seat.column, 'user_id': user_id},
+                {'$set': {'expires_at': expires_at}},
+                upsert=True
+            )
+            for seat in seats
+        ]
+        try:
+            collection.bulk_write(requests, ordered=False)
+        except BulkWriteError as error:
+            failed = {
+                write_error['index'] for write_error in error.details['writeErrors']
+                if write_error['code'] == DUPLICATE_KEY
+            }
+            if len(failed) != len(error.details['writeErrors']):
+                raise
+            SeatHold.undo(previous, [upserted['_id'] for upserted in error.details['upserted']])
+            return None, [seat for index, seat in enumerate(seats) if index in failed]
+        return expires_at.replace(tzinfo=timezone.utc), []
+
+    @staticmethod
+    def undo(previous, upserted_ids):
+        requests = [UpdateOne({'_id': hold_id}, {'$set': {'expires_at': expires_at}}) for hold_id, expires_at in previous.items()]
+        if upserted_ids:
+            requests.append(DeleteMany({'_id': {'$in': upserted_ids}}))
+        if requests:
+            SeatHold._get_collection().bulk_write(requests, ordered=False)
+
+    @staticmethod
+    def extend(showtime_id, user_id):
+        now = datetime.utcnow()
+        expires_at = now + timedelta(minutes=HOLD_MINUTES)
+        result = SeatHold._get_collection().update_many(
+            {'showtime_id': showtime_id, 'user_id': user_id, 'expires_at': {'$gt': now}},
+            {'$set': {'expires_at': expires_at}}
+        )
+        return expires_at.replace(tzinfo=timezone.utc) if result.modified_count else None
+
+    @staticmethod
+    def held_seats(showtime_id, user_id):
+        return [
+            Seat(seatGroup=hold.seat_group, row=hold.row, column=hold.column)
+            for hold in SeatHold.objects(showtime_id=showtime_id, user_id=user_id, expires_at__gt=datetime.utcnow()).only('seat_group', 'row', 'column')
+        ]
+
+    @staticmethod
+    def release(showtime_id, user_id, seats=None):
+        query = SeatHold.seat_filter(showtime_id, seats) if seats else {'showtime_id': showtime_id}
+        query['user_id'] = user_id
+        return SeatHold._get_collection().delete_many(query).deleted_count
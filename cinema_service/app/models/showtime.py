@@ -0,0 +1,97 @@
+from mongoengine import Document, StringField, DateTimeField, IntField, EmbeddedDocumentListField
+from datetime import timedelta
+from .seat import SeatMap
+
+SCHEDULE_DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+CLEANUP_MINUTES = 30
+
+class Showtime(Document):
+    meta = {
+        'collection': 'showtimes',
+        'indexes': [
+            ('cinema_id', 'start_time'),
+            ('movie_id', 'start_time'),
+            'end_time',
+        ]
+    }
+    cinema_id = StringField(required=True)
+    movie_id = StringField(required=True)
+    day = StringField(required=True, choices=SCHEDULE_DAYS)
+    start_time = DateTimeField(required=True)
+    end_time = DateTimeField(required=True)
+    duration = IntField(required=True)
+    price = IntField(required=True)
+    seat_maps = EmbeddedDocumentListField(SeatMap)
+
+    def clean(self):
+        self.end_time = self.start_time + timedelta(minutes=self.duration + CLEANUP_MINUTES)
+
+    @staticmethod
+    def find(cinema_id, day, movie_id, start_time, *fields):
+        query = Showtime.objects(cinema_id=cinema_id, start_time=start_time, movie_id=movie_id, day=day)
+        if fields:
+            query = query.only(*fields)
+        return query.first()
+
+    @staticmethod
+    def overlaps(cinema_id, day, start_time, end_time):
+        return Showtime.objects(
+            cinema_id=cinema_id, day=day, start_time__lt=end_time, end_time__gt=start_time
+        ).only('id').first() is not None
+
+    @staticmethod
+    def unavailable_seats(showtime, seats):
+        if not showtime:
+            return list(seats)
+        seat_maps = {seat_map.group_name: seat_map for seat_map in showtime.seat_maps}
+        unavailable = []
+        for group_name, group_seats in Showtime.group_seats(seats).items():
+            seat_map = seat_maps.get(group_name)
+            unavailable.extend(seat_map.unavailable_seats(group_seats) if seat_map else group_seats)
+        return unavailable
+
+    @staticmethod
+    def group_seats(seats):
+        groups = {}
+        for seat in seats:
+            groups.setdefault(seat.seatGroup, []).append(seat)
+        return groups
+
+    @staticmethod
+    def book_seats(showtime, seats):
+        # One conditional update on the showtime document: for every touched
+        # word the filter requires the seats to exist in the layout and be clear
+        # in the taken bitmap, and $bit sets them all at once. Either every seat
+        # is booked or none is, even when concurrent bookings race. `showtime`
+        # only needs the shape of its seat maps (group_name, rows, row_words).
+        seat_maps = {seat_map.group_name: seat_map for seat_map in showtime.seat_maps}
+        groups = Showtime.group_seats(seats)
+        out_of_range = [
+            seat
+            for group_name, group_seats in groups.items()
+            for seat in group_seats
+            if group_name not in seat_maps or not seat_maps[group_name].in_range(seat.row, seat.column)
+        ]
+        if out_of_range:
+            return out_of_range
+        conditions = []
+        bits = {}
+        array_filters = []
+        for index, (group_name, group_seats) in enumerate(groups.items()):
+            masks = seat_maps[group_name].row_masks(group_seats)
+            condition = {'group_name': group_name}
+            for word, mask in masks.items():
+                condition[f'layout.{word}'] = {'$bitsAllSet': mask}
+                condition[f'taken.{word}'] = {'$bitsAllClear': mask}
+                bits[f'seat_maps.$[g{index}].taken.{word}'] = {'or': mask}
+            conditions.append({'seat_maps': {'$elemMatch': condition}})
+            array_filters.append({f'g{index}.group_name': group_name})
+        result = Showtime._get_collection().update_one(
+            {'_id': showtime.id, '$and': conditions},
+            {'$bit': bits},
+            array_filters=array_filters
+        )
+        if result.modified_count:
+            return []
+        showtime = Showtime.objects(id=showtime.id).only('seat_maps').first()
+        return Showtime.unavailable_seats(showtime, seats) or list(seats)
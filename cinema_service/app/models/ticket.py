@@ -4,7 +4,7 @@ from .movie import MovieModel
 from .cinema import CinemaModel
 
 class TicketModel(Document):
-    meta = {'collection': 'tickets'}
+    meta = {'collection': 'tickets', 'indexes': ['user']}
     user = StringField(required=True)
     movie = ReferenceField(MovieModel, required=True)
     cinema = ReferenceField(CinemaModel, required=True)
@@ -1,16 +1,19 @@
-from mongoengine import Document, StringField
+from mongoengine import Document, StringField, ListField
 from argon2 import PasswordHasher
 from argon2.exceptions import VerifyMismatchError
 from email_validator import validate_email, EmailNotValidError
 from mongoengine.errors import ValidationError
+from ..util.search import SEARCH_INDEXES, build_keywords
 
 ph = PasswordHasher()
 
 class UserModel(Document):
-    meta = {'collection': 'users'}
+    meta = {'collection': 'users', 'indexes': SEARCH_INDEXES}
+    search_fields = ('username', 'email')
     username = StringField(required=True, unique=True)
     email = StringField(required=True, unique=True)
     password_hash = StringField(required=True)
+    search_keywords = ListField(StringField())
 
     def set_password(self, password):
         self.password_hash = ph.hash(password)
@@ -25,4 +28,5 @@ class UserModel(Document):
         try:
             validate_email(self.email)
         except EmailNotValidError as e:
-            raise ValidationError(f"Invalid email address: {str(e)}")
\ No newline at end of file
+            raise ValidationError(f"Invalid email address: {str(e)}")
+        self.search_keywords = build_keywords(self.username, self.email)
\ No newline at end of file
@@ -0,0 +1,305 @@
+from app.schemas import schema
+from app.schemas.documents import document_cache
+
+# Every document the admin blueprints run. They are parsed and validated once
+# at import and executed with variables only, so request data never becomes
+# part of a GraphQL document.
+
+PAGE_SELECTION = '''
+    totalCount
+    pageInfo {
+        hasNextPage
+        hasPreviousPage
+        startCursor
+        endCursor
+    }
+    edges {
+        node {
+            %s
+        }
+    }
+'''
+USER_FIELDS = 'id username email'
+MOVIE_FIELDS = 'id title genres duration'
+CINEMA_FIELDS = 'id name location'
+ACTOR_FIELDS = 'id name'
+CINEMA_DETAILS = '''
+    id
+    name
+    location
+    imageUrl
+    workingDays {
+        day
+        startTime
+        endTime
+    }
+    seatGroups {
+        groupName
+        rows
+        columns
+        seats {
+            row
+            column
+            isTaken
+        }
+    }
+'''
+
+OPERATIONS = {
+    'allUsers': '''
+    query allUsers($first: Int, $after: String, $last: Int, $before: String) {
+        users: allUsersConnection(first: $first, after: $after, last: $last, before: $before) {
+            %s
+        }
+    }
+    ''' % (PAGE_SELECTION % USER_FIELDS),
+    'searchUsers': '''
+    query searchUsers($query: String!, $first: Int, $after: String, $last: Int, $before: String) {
+        users: searchUsersConnection(query: $query, first: $first, after: $after, last: $last, before: $before) {
+            %s
+        }
+    }
+    ''' % (PAGE_SELECTION % USER_FIELDS),
+    'createUser': '''
+    mutation createUser($username: String!, $email: String!, $password: String!, $captcha: String!) {
+        createUser(username: $username, email: $email, password: $password, captcha: $captcha) {
+            user {
+                id
+                username
+                email
+            }
+        }
+    }
+    ''',
+    'deleteUser': '''
+    mutation deleteUser($userId: String!) {
+        deleteUser(userId: $userId) {
+            success
+        }
+    }
+    ''',
+    'fetchUser': '''
+    query fetchUser($userId: String!) {
+        fetchUser(userId: $userId) {
+            id
+            username
+            email
+        }
+    }
+    ''',
+    'editUser': '''
+    mutation editUser($userId: String!, $newUsername: String, $newEmail: String) {
+        editUser(userId: $userId, newUsername: $newUsername, newEmail: $newEmail) {
+            success
+        }
+    }
+    ''',
+    'allMovies': '''
+    query allMovies($first: Int, $after: String, $last: Int, $before: String) {
+        movies: allMoviesConnection(first: $first, after: $after, last: $last, before: $before) {
+            %s
+        }
+    }
+    ''' % (PAGE_SELECTION % MOVIE_FIELDS),
+    'searchMovies': '''
+    query searchMovies($query: String!, $first: Int, $after: String, $last: Int, $before: String) {
+        movies: searchMoviesConnection(query: $query, first: $first, after: $after, last: $last, before: $before) {
+            %s
+        }
+    }
+    ''' % (PAGE_SELECTION % MOVIE_FIELDS),
+    'createMovie': '''
+    mutation createMovie($title: String!, $genres: [String]!, $duration: Int!, $posterUrl: String!, $videoUrl: String!, $description: String!, $actorIds: [ID]) {
+        createMovie(title: $title, genres: $genres, duration: $duration, posterUrl: $posterUrl, videoUrl: $videoUrl, description: $description, actorIds: $actorIds) {
+            movie {
+                id
+                title
+            }
+        }
+    }
+    ''',
+    'deleteMovie': '''
+    mutation deleteMovie($movieId: String!) {
+        deleteMovie(movieId: $movieId) {
+            success
+        }
+    }
+    ''',
+    'fetchMovie': '''
+    query fetchMovie($movieId: String!) {
+        fetchMovie(movieId: $movieId) {
+            id
+            title
+            genres
+            duration
+            posterUrl
+            videoUrl
+            description
+            actors {
+                id
+                name
+            }
+        }
+    }
+    ''',
+    'fetchMoviePoster': '''
+    query fetchMoviePoster($movieId: String!) {
+        fetchMovie(movieId: $movieId) {
+            posterUrl
+        }
+    }
+    ''',
+    'editMovie': '''
+    mutation editMovie($movieId: String!, $newTitle: String, $newGenres: [String], $newDuration: Int, $newPosterUrl: String, $newVideoUrl: String, $newDescription: String, $newActorIds: [ID]) {
+        editMovie(movieId: $movieId, newTitle: $newTitle, newGenres: $newGenres, newDuration: $newDuration, newPosterUrl: $newPosterUrl, newVideoUrl: $newVideoUrl, newDescription: $newDescription, newActorIds: $newActorIds) {
+            success
+        }
+    }
+    ''',
+    'allCinemas': '''
+    query allCinemas($first: Int, $after: String, $last: Int, $before: String) {
+        cinemas: allCinemasConnection(first: $first, after: $after, last: $last, before: $before) {
+            %s
+        }
+    }
+    ''' % (PAGE_SELECTION % CINEMA_FIELDS),
+    'searchCinemas': '''
+    query searchCinemas($query: String!, $first: Int, $after: String, $last: Int, $before: String) {
+        cinemas: searchCinemasConnection(query: $query, first: $first, after: $after, last: $last, before: $before) {
+            %s
+        }
+    }
+    ''' % (PAGE_SELECTION % CINEMA_FIELDS),
+    'createCinema': '''
+    mutation createCinema($name: String!, $location: String!, $imageUrl: String!, $workingDays: [WorkingDayInput], $seatGroups: [SeatGroupInput]) {
+        createCinema(name: $name, location: $location, imageUrl: $imageUrl, workingDays: $workingDays, seatGroups: $seatGroups) {
+            cinema {
+                %s
+            }
+        }
+    }
+    ''' % CINEMA_DETAILS,
+    'deleteCinema': '''
+    mutation deleteCinema($cinemaId: ID!) {
+        deleteCinema(cinemaId: $cinemaId) {
+            success
+        }
+    }
+    ''',
+    'fetchCinema': '''
+    query fetchCinema($cinemaId: String!) {
+        fetchCinema(cinemaId: $cinemaId) {
+            %s
+        }
+    }
+    ''' % CINEMA_DETAILS,
+    'fetchCinemaImage': '''
+    query fetchCinemaImage($cinemaId: String!) {
+        fetchCinema(cinemaId: $cinemaId) {
+            imageUrl
+        }
+    }
+    ''',
+    'editCinema': '''
+    mutation editCinema($cinemaId: ID!, $newName: String, $newLocation: String, $newImageurl: String, $newWorkingDays: [WorkingDayInput], $newSeatGroups: [SeatGroupInput]) {
+        editCinema(cinemaId: $cinemaId, newName: $newName, newLocation: $newLocation, newImageurl: $newImageurl, newWorkingDays: $newWorkingDays, newSeatGroups: $newSeatGroups) {
+            success
+        }
+    }
+    ''',
+    'addScheduleItem': '''
+    mutation addScheduleItem($scheduleDay: String!, $movieId: String!, $startTime: String!, $duration: Int!, $cinemaId: String!, $price: Int!) {
+        addScheduleItem(scheduleDay: $scheduleDay, movieId: $movieId, startTime: $startTime, duration: $duration, cinemaId: $cinemaId, price: $price) {
+            ok
+            message
+        }
+    }
+    ''',
+    'getSchedules': '''
+    query getSchedules($cinema_id: String!) {
+        schedules(cinemaId: $cinema_id) {
+            scheduleDays {
+                day
+                scheduleItems {
+                    movieId
+                    startTime
+                    duration
+                    price
+                }
+            }
+        }
+    }
+    ''',
+    'allActors': '''
+    query allActors($query: String, $first: Int, $after: String, $last: Int, $before: String) {
+        actors: allActorsConnection(query: $query, first: $first, after: $after, last: $last, before: $before) {
+            %s
+        }
+    }
+    ''' % (PAGE_SELECTION % ACTOR_FIELDS),
+    'createActor': '''
+    mutation createActor($name: String!, $movieIds: [ID]!) {
+        createActor(name: $name, movieIds: $movieIds) {
+            actor {
+                id
+                name
+            }
+        }
+    }
+    ''',
+    'deleteActor': '''
+    mutation deleteActor($actorId: String!) {
+        deleteActor(actorId: $actorId) {
+            success
+        }
+    }
+    ''',
+    'fetchActor': '''
+    query fetchActor($actorId: String!) {
+        fetchActor(actorId: $actorId) {
+            id
+            name
+            movies {
+                id
+            }
+        }
+    }
+    ''',
+    'editActor': '''
+    mutation editActor($actorId: String!, $name: String, $movieIds: [String]) {
+        editActor(actorId: $actorId, name: $name, movieIds: $movieIds) {
+            actor {
+                id
+                name
+                movies {
+                    id
+                }
+            }
+        }
+    }
+    ''',
+    'createAdmin': '''
+    mutation createAdmin($username: String!, $password: String!) {
+        createAdmin(username: $username, password: $password) {
+            ok
+        }
+    }
+    ''',
+    'loginAdmin': '''
+    mutation login($username: String!, $password: String!) {
+        loginAdmin(username: $username, password: $password) {
+            ok
+            auth {
+                accessToken
+            }
+            message
+        }
+    }
+    ''',
+}
+
+for document in OPERATIONS.values():
+    document_cache.register(schema, document)
+
+def execute_operation(name, variables=None):
+    return schema.execute(OPERATIONS[name], variables=variables, backend=document_cache)
@@ -3,7 +3,7 @@ from flask_jwt_extended import jwt_required
 import requests
 from app.forms import AddUserForm, AddMovieForm, AddCinemaForm, AddActorForm, WorkingDayForm, SeatForm, SeatGroupForm
 from .models.actor import ActorModel as Actor
-from app.schemas import schema
+from app.operations import execute_operation
 import cloudinary
 import cloudinary.api
 import cloudinary.uploader
@@ -11,7 +11,6 @@ import os
 from dotenv import load_dotenv
 from math import ceil
 from app.models.genre import GenreEnum
-import json
 from flask_wtf.csrf import validate_csrf
 from datetime import datetime
 from flask import current_app
@@ -22,12 +21,34 @@ movies_bp = Blueprint('movies', __name__, url_prefix='/cinema-service/admin/movi
 cinemas_bp = Blueprint('cinemas', __name__, url_prefix='/cinema-service/admin/cinemas')
 actors_bp = Blueprint('actors', __name__, url_prefix='/cinema-service/admin/actors')
 
-def format_seat(seat):
-    return f'{{row: {seat["row"]}, column: {seat["column"]}, isTaken: {str(seat.get("isTaken", False)).lower()}}}'
+def cursor_arguments(items_per_page):
+    before = request.args.get('before')
+    if before:
+        return {'last': items_per_page, 'before': before}
+    return {'first': items_per_page, 'after': request.args.get('after')}
 
-def format_seat_group(seat_group):
-    seats_str = ', '.join(format_seat(seat) for seat in seat_group['seats'])
-    return f'{{groupName: "{seat_group["group_name"]}", rows: {seat_group["rows"]}, columns: {seat_group["columns"]}, seats: [{seats_str}]}}'
+def cursor_pagination(connection, page, total_pages, substring=None):
+    page_info = connection['pageInfo']
+    return {
+        'current_page': page,
+        'total_pages': total_pages,
+        'has_previous': page_info['hasPreviousPage'],
+        'has_next': page_info['hasNextPage'],
+        'start_cursor': page_info['startCursor'],
+        'end_cursor': page_info['endCursor'],
+        'substring': substring
+    }
+
+def working_day_input(working_day):
+    return {'day': working_day['day'][1], 'startTime': working_day['start_time'][1], 'endTime': working_day['end_time'][1]}
+
+def seat_group_input(seat_group):
+    return {
+        'groupName': seat_group.get('group_name'),
+        'rows': seat_group['rows'],
+        'columns': seat_group['columns'],
+        'seats': [{'row': int(seat['row']), 'column': int(seat['column']), 'isTaken': False} for seat in seat_group['seats']]
+    }
 
 @users_bp.context_processor
 def inject_current_url():
@@ -50,64 +71,26 @@ def inject_current_url():
 def view_users():
     page = request.args.get('page', default=1, type=int)
     items_per_page = 10
-    skip = (page - 1) * items_per_page
-    substring = request.args.get('substring')
-    if substring is None or len(substring) < 1:
-        query = '''
-        {
-            allUsers(skip: %d, limit: %d) {
-                id
-                username
-                email
-            }
-        }
-        ''' % (skip, items_per_page)
-        result = schema.execute(query)
-        
-        if result.errors:
-            errors = [str(e) for e in result.errors]
-            return jsonify({'errors': errors}), 400
-        
-        users = result.data['allUsers']
-    else:
-        query = '''
-        { 
-            searchUsers(query: "%s",skip: %d, limit: %d) {
-                id
-                username
-                email
-            }
-        }
-        ''' % (substring, skip, items_per_page)
-        result = schema.execute(query)
-        if result.errors:
-            errors = [str(e) for e in result.errors]
-            return jsonify({'errors': errors}), 400
-        
-        users = result.data['searchUsers']
+    substring = request.args.get('substring') or None
+    variables = cursor_arguments(items_per_page)
+    operation = 'allUsers' if substring is None else 'searchUsers'
+    if substring is not None:
+        variables['query'] = substring
+    result = execute_operation(operation, variables)
+    if result.errors:
+        errors = [str(e) for e in result.errors]
+        return jsonify({'errors': errors}), 400
         
-    total_users = get_total_users_count(substring)
+    connection = result.data['users']
+    total_users = connection['totalCount']
     total_pages = ceil(total_users / items_per_page) 
 
     if total_users>0 and page>total_pages or page<0:
         return redirect(url_for("users.view_users"))
-    pagination = {
-        'current_page': page,
-        'total_pages': total_pages
-    }
-
-    users = result.data['allUsers'] if substring is None else result.data['searchUsers']
+    pagination = cursor_pagination(connection, page, total_pages, substring)
+    users = [edge['node'] for edge in connection['edges']]
     
     return render_template('/users/users.html', users=users, pagination=pagination)
-def get_total_users_count(substring=None):
-    if substring is None:
-        query = '{ usersCount }'
-    else:
-        query = '{ searchUsersCount(query: "%s") }' % substring
-    result = schema.execute(query)
-    if result.errors:
-        return 0
-    return result.data['usersCount'] if substring is None else result.data['searchUsersCount']
 
 @users_bp.route('/add', methods=['POST','GET'])
 @jwt_required()
@@ -133,19 +116,8 @@ def add_user():
             flash('Invalid CAPTCHA. Please try again.', 'error')
             return render_template('/users/add_user.html', form=form)
 
-        mutation_query = f"""
-            mutation {{
-                createUser(username: "{username}", email: "{email}", password: "{password}") {{
-                    user {{
-                        id
-                        username
-                        email
-                    }}
-                }}
-            }}
-        """
         try:
-            result = schema.execute(mutation_query)
+            result = execute_operation('createUser', {'username': username, 'email': email, 'password': password, 'captcha': captcha_response})
             if result.errors:
                 print(result.errors)
                 flash('Failed to add user.', 'error')
@@ -165,16 +137,7 @@ def delete_user(id):
         validate_csrf(csrf_token)
     except:
         return jsonify({"msg": "CSRF token is missing or invalid."}), 400
-    user_id = id
-    mutation = '''
-        mutation {
-            deleteUser(userId: "%s") {
-                success
-            }
-        }
-    ''' % user_id
-    
-    result = schema.execute(mutation)
+    result = execute_operation('deleteUser', {'userId': id})
 
     if result.errors:
         errors = [str(e) for e in result.errors]
@@ -186,16 +149,7 @@ def delete_user(id):
 @jwt_required()
 def edit_user(id):
     if request.method == 'GET':
-        query = '''
-            query {
-                fetchUser(userId: "%s") {
-                    id
-                    username
-                    email
-                }
-            }
-        ''' % id
-        user = schema.execute(query)
+        user = execute_operation('fetchUser', {'userId': id})
         if user.errors:
             raise Exception(f"Failed to fetch user with id {id}")
         if not user:
@@ -211,15 +165,7 @@ def edit_user(id):
         new_username = request.form.get('username')
         new_email = request.form.get('email')
 
-        mutation = '''
-            mutation {
-                editUser(userId: "%s", newUsername: "%s", newEmail: "%s") {
-                    success
-                }
-            }
-        ''' % (id, new_username, new_email)
-
-        result = schema.execute(mutation)
+        result = execute_operation('editUser', {'userId': id, 'newUsername': new_username, 'newEmail': new_email})
 
         if result.errors:
             errors = [str(e) for e in result.errors]
@@ -236,61 +182,29 @@ def edit_user(id):
 def view_movies():
     page = request.args.get('page', default=1, type=int)
     items_per_page = 10
-    skip = (page - 1) * items_per_page
-    substring = request.args.get('substring')
+    substring = request.args.get('substring') or None
+    variables = cursor_arguments(items_per_page)
     
-    if substring is None or len(substring) < 1:
-        query = '''
-        {
-            allMoviesPage(skip: %d, limit: %d) {
-                id
-                title
-                genres
-                duration
-            }
-        }
-        ''' % (skip, items_per_page)
-    else:
-        query = '''
-        {
-            searchMoviesPage(query: "%s", skip: %d, limit: %d) {
-                id
-                title
-                genres
-                duration
-            }
-        }
-        ''' % (substring, skip, items_per_page)
+    operation = 'allMovies' if substring is None else 'searchMovies'
+    if substring is not None:
+        variables['query'] = substring
         
-    result = schema.execute(query) 
+    result = execute_operation(operation, variables)
 
     if result.errors:
         errors = [str(e) for e in result.errors]
         return jsonify({'errors': errors}), 400
     
-    total_movies = get_total_movie_count(substring)
+    connection = result.data['movies']
+    total_movies = connection['totalCount']
     total_pages = ceil(total_movies / items_per_page) 
     if total_movies>0 and page>total_pages or page<0:
         return redirect(url_for("movies.view_movies"))
-    pagination = {
-        'current_page': page,
-        'total_pages': total_pages
-    }
-
-    movies = result.data['allMoviesPage'] if substring is None else result.data['searchMoviesPage']
+    pagination = cursor_pagination(connection, page, total_pages, substring)
+    movies = [edge['node'] for edge in connection['edges']]
 
     return render_template('/movies/movies.html', movies=movies, pagination=pagination)
 
-def get_total_movie_count(substring=None):
-    if substring is None:
-        query = '{ movieCount }'
-    else:
-        query = '{ searchMovieCount(query: "%s") }' % substring
-    result = schema.execute(query)
-    if result.errors:
-        return 0
-    return result.data['movieCount'] if substring is None else result.data['searchMovieCount']
-
 @movies_bp.route('/add', methods=['POST','GET'])
 @jwt_required()
 def add_movie():
@@ -300,7 +214,6 @@ def add_movie():
         description = form.description.data
         genres = request.form.getlist('genres')
         genres = genres[0].split(',')
-        genres = json.dumps(genres)
         duration = form.duration.data
         poster_file = form.poster.data
         video_url = form.video_url.data
@@ -318,35 +231,17 @@ def add_movie():
             poster_url = upload_result['secure_url']
         else:
             poster_url = None
-        mutation_query = f"""
-            mutation {{
-                createMovie(
-                    title: "{title}",
-                    genres: {genres},
-                    duration: {duration},
-                    posterUrl: "{poster_url}",
-                    videoUrl: "{video_url}",
-                    description: "{description}",
-                    actorIds: {json.dumps(actor_ids)}
-                ) {{
-                    movie {{
-                        id
-                        title
-                        genres
-                        duration
-                        posterUrl
-                        videoUrl
-                        description
-                        actors {{
-                            id
-                            name
-                        }}
-                    }}
-                }}
-            }}
-        """
+        variables = {
+            'title': title,
+            'genres': genres,
+            'duration': duration,
+            'posterUrl': poster_url or '',
+            'videoUrl': video_url,
+            'description': description,
+            'actorIds': actor_ids
+        }
         try:
-            result = schema.execute(mutation_query)
+            result = execute_operation('createMovie', variables)
             if result.errors:
                 print(result.errors)
                 flash('Failed to add movie.', 'error')
@@ -365,16 +260,8 @@ def delete_movie(id):
         validate_csrf(csrf_token)
     except:
         return jsonify({"msg": "CSRF token is missing or invalid."}), 400
-    mutation_query = f"""
-        mutation {{
-            deleteMovie(movieId: "{id}") {{
-                success
-            }}
-        }}
-    """
-    
     try:
-        result = schema.execute(mutation_query)
+        result = execute_operation('deleteMovie', {'movieId': id})
         if result.errors:
             raise Exception(result.errors)
         success = result.data.get('deleteMovie', {}).get('success', False)
@@ -389,24 +276,7 @@ def delete_movie(id):
 @jwt_required()
 def edit_movie(id):
     if request.method == 'GET':
-        query = '''
-            query {
-                fetchMovie(movieId: "%s") {
-                    id
-                    title
-                    genres
-                    duration
-                    posterUrl
-                    videoUrl
-                    description
-                    actors {
-                        id
-                        name
-                    }
-                }
-            }
-        ''' % id
-        movie = schema.execute(query)
+        movie = execute_operation('fetchMovie', {'movieId': id})
         if movie.errors:
             raise Exception(f"Failed to fetch movie with id {id}")
         if not movie:
@@ -428,22 +298,13 @@ def edit_movie(id):
         new_genres = new_genres.strip("'")
         new_genres = new_genres.strip("[]'")
         new_genres = new_genres.split(',')
-        new_genres = json.dumps(new_genres)
-        new_duration = request.form.get('duration')
+        new_duration = request.form.get('duration', type=int)
         new_poster = request.files.get('poster')
         new_video_url = request.form.get('video_url')
         new_description = request.form.get('description')
         new_actor_ids = request.form.getlist('actors')
-        new_actor_ids_json = json.dumps(new_actor_ids)
         
-        query = '''
-            query {
-                fetchMovie(movieId: "%s") {
-                    posterUrl
-                }
-            }
-        ''' % id
-        movie = schema.execute(query)
+        movie = execute_operation('fetchMoviePoster', {'movieId': id})
         if movie.errors:
             raise Exception(f"Failed to fetch movie with id {id}")
         movie_data = movie.data.get('fetchMovie')
@@ -464,14 +325,17 @@ def edit_movie(id):
         if new_poster.filename:
             upload_result = cloudinary.uploader.upload(new_poster)
             new_poster_url = upload_result['secure_url']
-        mutation = '''
-            mutation {
-                editMovie(movieId: "%s", newTitle: "%s", newGenres: %s, newDuration: %s, newPosterUrl: "%s", newVideoUrl: "%s", newDescription: "%s", newActorIds: %s) {
-                    success
-                }
-            }
-        ''' % (id, new_title, new_genres, new_duration, new_poster_url, new_video_url, new_description, new_actor_ids_json)
-        result = schema.execute(mutation)
+        variables = {
+            'movieId': id,
+            'newTitle': new_title,
+            'newGenres': new_genres,
+            'newDuration': new_duration,
+            'newPosterUrl': new_poster_url,
+            'newVideoUrl': new_video_url,
+            'newDescription': new_description,
+            'newActorIds': new_actor_ids
+        }
+        result = execute_operation('editMovie', variables)
         
 
         if result.errors:
@@ -489,60 +353,30 @@ def edit_movie(id):
 def view_cinemas():
     page = request.args.get('page', default=1, type=int)
     items_per_page = 10
-    skip = (page - 1) * items_per_page
-    substring = request.args.get('substring')
+    substring = request.args.get('substring') or None
+    variables = cursor_arguments(items_per_page)
     
-    if substring is None or len(substring) < 1:
-        query = '''
-        {
-            allCinemas(skip: %d, limit: %d) {
-                id
-                name
-                location
-            }
-        }
-        ''' % (skip, items_per_page)
-    else:
-        query = '''
-        {
-            searchCinemas(query: "%s", skip: %d, limit: %d) {
-                id
-                name
-                location
-            }
-        }
-        ''' % (substring, skip, items_per_page)  
+    operation = 'allCinemas' if substring is None else 'searchCinemas'
+    if substring is not None:
+        variables['query'] = substring
         
-    result = schema.execute(query)  
+    result = execute_operation(operation, variables)
     if result.errors:
         errors = [str(e) for e in result.errors]
         return jsonify({'errors': errors}), 400  
     
-    total_movies = get_total_cinema_count(substring)
+    connection = result.data['cinemas']
+    total_movies = connection['totalCount']
     total_pages = ceil(total_movies / items_per_page) 
 
     if total_movies>0 and page>total_pages or page<0:
         return redirect(url_for("cinemas.view_cinemas"))
     
-    pagination = {
-        'current_page': page,
-        'total_pages': total_pages
-    }
-
-    cinemas = result.data['allCinemas'] if substring is None else result.data['searchCinemas']
+    pagination = cursor_pagination(connection, page, total_pages, substring)
+    cinemas = [edge['node'] for edge in connection['edges']]
 
     return render_template('/cinemas/cinemas.html', cinemas=cinemas, pagination=pagination)   
  
-def get_total_cinema_count(substring=None):
-    if substring is None:
-        query = '{ cinemaCount }'
-    else:
-        query = '{ searchCinemaCount(query: "%s") }' % substring
-    result = schema.execute(query)
-    if result.errors:
-        return 0
-    return result.data['cinemaCount'] if substring is None else result.data['searchCinemaCount']
-
 @cinemas_bp.route('/add', methods=['GET','POST'])
 @jwt_required()
 def add_cinema():
@@ -577,7 +411,6 @@ def add_cinema():
                 'start_time': start_times[i],
                 'end_time': end_times[i]
             })
-        working_days_str = ', '.join([f"{{day: \"{wd['day']}\", startTime: \"{wd['start_time']}\", endTime: \"{wd['end_time']}\"}}" for wd in working_days_data])
 
         seat_groups_data = defaultdict(lambda: {'rows': 0, 'columns': 0, 'seats': []})
         for key, value in request.form.items():
@@ -607,7 +440,6 @@ def add_cinema():
                             'is_taken': False
                         })
         seat_groups_data = dict(seat_groups_data)
-        seat_groups_str = ', '.join(format_seat_group(sg) for sg in seat_groups_data.values())
         
         load_dotenv()
         cloudinary.config(
@@ -622,35 +454,15 @@ def add_cinema():
         else:
             imageUrl = None
 
-        mutation_query = f"""
-            mutation {{
-                createCinema(name: "{name}", location: "{location}", imageUrl: "{imageUrl}", workingDays: [{working_days_str}], seatGroups: [{seat_groups_str}]) {{
-                    cinema {{
-                        id
-                        name
-                        location
-                        imageUrl
-                        workingDays {{
-                            day
-                            startTime
-                            endTime
-                        }}
-                        seatGroups {{
-                            groupName
-                            rows
-                            columns
-                            seats {{
-                                row
-                                column
-                                isTaken
-                            }}
-                        }}
-                    }}
-                }}
-            }}
-        """
+        variables = {
+            'name': name,
+            'location': location,
+            'imageUrl': imageUrl or '',
+            'workingDays': [working_day_input(wd) for wd in working_days_data],
+            'seatGroups': [seat_group_input(sg) for sg in seat_groups_data.values()]
+        }
         try:
-            result = schema.execute(mutation_query)
+            result = execute_operation('createCinema', variables)
             if result.errors:
                 print(result.errors)
                 flash('Failed to add cinema.', 'error')
@@ -671,16 +483,8 @@ def delete_cinema(id):
         validate_csrf(csrf_token)
     except:
         return jsonify({"msg": "CSRF token is missing or invalid."}), 400
-    mutation_query = f"""
-        mutation {{
-            deleteCinema(cinemaId: "{id}") {{
-                success
-            }}
-        }}
-    """
-    
     try:
-        result = schema.execute(mutation_query)
+        result = execute_operation('deleteCinema', {'cinemaId': id})
         if result.errors:
             raise Exception(result.errors)
         success = result.data.get('deleteCinema', {}).get('success', False)
@@ -695,32 +499,7 @@ def delete_cinema(id):
 @jwt_required()
 def edit_cinema(id):
     if request.method == 'GET':
-        query = '''
-            query {
-                fetchCinema(cinemaId: "%s") {
-                    id
-                    name
-                    location
-                    imageUrl
-                    workingDays {
-                        day
-                        startTime
-                        endTime
-                    }
-                    seatGroups {
-                        groupName
-                        rows
-                        columns
-                        seats {
-                            row
-                            column
-                            isTaken
-                        }
-                    }
-                }
-            }
-        ''' % id
-        cinema = schema.execute(query)
+        cinema = execute_operation('fetchCinema', {'cinemaId': id})
         if cinema.errors:
             raise Exception(f"Failed to fetch cinema with id {id}")
         if not cinema:
@@ -812,14 +591,7 @@ def edit_cinema(id):
                         })        
         seat_groups_data = dict(seat_groups_data)
         
-        query = '''
-            query {
-                fetchCinema(cinemaId: "%s") {
-                    imageUrl
-                }
-            }
-        ''' % id
-        cinema = schema.execute(query)
+        cinema = execute_operation('fetchCinemaImage', {'cinemaId': id})
         if cinema.errors:
             raise Exception(f"Failed to fetch cinema with id {id}")
         cinema_data = cinema.data.get('fetchCinema')
@@ -841,17 +613,15 @@ def edit_cinema(id):
             upload_result = cloudinary.uploader.upload(new_image)
             new_image_url = upload_result['secure_url']
             
-        working_days_str = ', '.join([f"{{day: \"{wd['day']}\", startTime: \"{wd['start_time']}\", endTime: \"{wd['end_time']}\"}}" for wd in working_days_data])
-        seat_groups_str = ', '.join(format_seat_group(sg) for sg in seat_groups_data.values())
-        mutation = '''
-            mutation {
-                editCinema(cinemaId: "%s", newName: "%s", newLocation: "%s", newImageurl: "%s", newWorkingDays: [%s], newSeatGroups: [%s]) {
-                    success
-                }
-            }
-        ''' % (id, new_name, new_location, new_image_url, working_days_str, seat_groups_str)
-
-        result = schema.execute(mutation)
+        variables = {
+            'cinemaId': id,
+            'newName': new_name,
+            'newLocation': new_location,
+            'newImageurl': new_image_url,
+            'newWorkingDays': [working_day_input(wd) for wd in working_days_data],
+            'newSeatGroups': [seat_group_input(sg) for sg in seat_groups_data.values()]
+        }
+        result = execute_operation('editCinema', variables)
 
         if result.errors:
             errors = [str(e) for e in result.errors]
@@ -874,23 +644,15 @@ def schedule(cinema_id):
         except:
             return jsonify({"msg": "CSRF token is missing or invalid."}), 400
         
-        mutation_query = '''
-        mutation addScheduleItem($scheduleDay: String!, $movieId: String!, $startTime: String!, $duration: Int!, $cinemaId: String!, $price: Int!) {
-            addScheduleItem(scheduleDay: $scheduleDay, movieId: $movieId, startTime: $startTime, duration: $duration, cinemaId: $cinemaId, price: $price) {
-                ok
-                message
-            }
-        }
-        '''
         variables = {
             'scheduleDay': request.form['schedule_day'],
             'movieId': request.form['movie_id'],
             'startTime': request.form['start_time'],
             'duration': int(request.form['duration']),
             'cinemaId': cinema_id,
-            'price': request.form['price']
+            'price': int(request.form['price'])
         }
-        result = schema.execute(mutation_query, variables=variables)
+        result = execute_operation('addScheduleItem', variables)
         message = ''
         if result.data:
             add_schedule_item_result = result.data.get('addScheduleItem')
@@ -909,24 +671,7 @@ def schedule(cinema_id):
         
         return redirect(url_for('cinemas.schedule', cinema_id=cinema_id, message=message))
     message = request.args.get('message', '')
-    query = '''
-    query getSchedules($cinema_id: String!) {
-        schedules(cinemaId: $cinema_id) {
-            scheduleDays {
-                day
-                scheduleItems {
-                    movieId
-                    startTime
-                    duration
-                    price
-                }
-            }
-        }
-    }
-    '''
-    
-    variables = {'cinema_id': cinema_id}
-    result = schema.execute(query, variables=variables)
+    result = execute_operation('getSchedules', {'cinema_id': cinema_id})
     
     schedule_data = result.data['schedules'] if result.data else None
 
@@ -939,22 +684,8 @@ def add_actor():
     if form.validate_on_submit():
         name = form.name.data
         movie_ids = form.movies.data
-        movie_ids_json = json.dumps(movie_ids)
-        mutation_query = f"""
-            mutation {{
-                createActor(name: "{name}", movieIds: {movie_ids_json}) {{
-                    actor {{
-                        id
-                        name
-                        movies {{
-                            id
-                        }}
-                    }}
-                }}
-            }}
-        """
         try:
-            result = schema.execute(mutation_query)
+            result = execute_operation('createActor', {'name': name, 'movieIds': movie_ids})
             if result.errors:
                 print(result.errors)
                 flash('Failed to add actor.', 'error')
@@ -970,75 +701,30 @@ def add_actor():
 def view_actors():
     page = request.args.get('page', default=1, type=int)
     items_per_page = 10
-    skip = (page - 1) * items_per_page
-    substring = request.args.get('substring')
-    if substring is None or len(substring) < 1:
-        query = '''
-        {
-            allActors(skip: %d, limit: %d) {
-                id
-                name
-            }
-        }
-        ''' % (skip, items_per_page)
-        result = schema.execute(query)
-        
-        if result.errors:
-            errors = [str(e) for e in result.errors]
-            return jsonify({'errors': errors}), 400
-    else:
-        query = '''
-        { 
-            allActors(query: "%s",skip: %d, limit: %d) {
-                id
-                name
-            }
-        }
-        ''' % (substring, skip, items_per_page)
-        result = schema.execute(query)
-        if result.errors:
-            errors = [str(e) for e in result.errors]
-            return jsonify({'errors': errors}), 400
-        
-    actors = result.data['allActors']
+    substring = request.args.get('substring') or None
+    variables = cursor_arguments(items_per_page)
+    variables['query'] = substring
+    result = execute_operation('allActors', variables)
+    if result.errors:
+        errors = [str(e) for e in result.errors]
+        return jsonify({'errors': errors}), 400
         
-    total_actors = get_total_actors_count(substring)
+    connection = result.data['actors']
+    total_actors = connection['totalCount']
     total_pages = ceil(total_actors / items_per_page) 
 
     if total_actors>0 and page>total_pages or page<0:
         return redirect(url_for("actors.view_actors"))
-    pagination = {
-        'current_page': page,
-        'total_pages': total_pages
-    }
-
-    actors = result.data['allActors']
+    pagination = cursor_pagination(connection, page, total_pages, substring)
+    actors = [edge['node'] for edge in connection['edges']]
     
     return render_template('/actors/actors.html', actors=actors, pagination=pagination)
 
-def get_total_actors_count(substring=None):
-    if substring is None:
-        query = '{ actorsCount }'
-    else:
-        query = '{ searchActorsCount(query: "%s") }' % substring
-    result = schema.execute(query)
-    if result.errors:
-        return 0
-    return result.data['actorsCount'] if substring is None else result.data['searchActorsCount']
-
 @actors_bp.route('/<id>/delete', methods=['POST'])
 @jwt_required()
 def delete_actor(id):
-    mutation_query = f"""
-        mutation {{
-            deleteActor(actorId: "{id}") {{
-                success
-            }}
-        }}
-    """
-    
     try:
-        result = schema.execute(mutation_query)
+        result = execute_operation('deleteActor', {'actorId': id})
         if result.errors:
             raise Exception(result.errors)
         success = result.data.get('deleteActor', {}).get('success', False)
@@ -1053,18 +739,7 @@ def delete_actor(id):
 @jwt_required()
 def edit_actor(id):
     if request.method == 'GET':
-        query = '''
-            query {
-                fetchActor(actorId: "%s") {
-                    id
-                    name
-                    movies {
-                        id
-                    }
-                }
-            }
-        ''' % id
-        actor = schema.execute(query)
+        actor = execute_operation('fetchActor', {'actorId': id})
         if actor.errors:
             raise Exception(f"Failed to fetch actor with id {id}")
         if not actors_bp:
@@ -1080,22 +755,8 @@ def edit_actor(id):
         form = AddActorForm() 
         name = form.name.data
         movie_ids = form.movies.data
-        movie_ids_json = json.dumps(movie_ids)
         
-        mutation_query = f"""
-                mutation {{
-                    editActor(actorId: "{id}", name: "{name}", movieIds: {movie_ids_json}) {{
-                        actor {{
-                            id
-                            name
-                            movies {{
-                                id
-                            }}
-                        }}
-                    }}
-                }}
-            """
-        actor = schema.execute(mutation_query)
+        actor = execute_operation('editActor', {'actorId': id, 'name': name, 'movieIds': movie_ids})
         if actor.errors:
             raise Exception(f"Failed to fetch actor with id {id}")
         actor_data = actor.data.get('editActor')
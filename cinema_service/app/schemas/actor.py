@@ -4,11 +4,47 @@ import graphene
 from graphene import String, List, ID, Int
 from ..models.movie import MovieModel
 from .movie import MovieType
+from .loaders import get_loaders, load_many, reference_ids
+from .projection import project
+from .pagination import paginate, facet_page, CountedConnection
+from app.util.search import search
+from app.util.response_cache import invalidate
+from app.util.relationships import existing_ids, set_actor_movies
 from mongoengine.queryset.visitor import Q
+from bson import ObjectId
+
+def movies_of_actor(actor_id, genre=None):
+    # Filters on the indexed movies.actors list, so the actor document and its
+    # own movie list are never loaded.
+    if not ObjectId.is_valid(actor_id):
+        raise Exception("Actor not found")
+    query_set = MovieModel.objects(actors=ObjectId(actor_id))
+    if genre:
+        query_set = query_set.filter(genres=genre)
+    return query_set
+
+def ensure_actor(actor_id, result):
+    # An empty result is the only case where the actor itself has to be looked up.
+    if not result and not ActorModel.objects(id=actor_id).only('id').first():
+        raise Exception("Actor not found")
+    return result
 
 class ActorType(MongoengineObjectType):
     class Meta:
         model = ActorModel
+        exclude_fields = ('search_keywords',)
+    movies = graphene.List(lambda: MovieType)
+
+    def resolve_movies(self, info):
+        return load_many(get_loaders(info).movies, reference_ids(self, 'movies'))
+
+class ActorConnection(CountedConnection):
+    class Meta:
+        node = ActorType
+
+class ActorPage(graphene.ObjectType):
+    items = graphene.List(ActorType)
+    total_count = graphene.Int()
     
 class CreateActor(graphene.Mutation):
     class Arguments:
@@ -18,12 +54,11 @@ class CreateActor(graphene.Mutation):
     actor = graphene.Field(ActorType)
 
     def mutate(self, info, name, movie_ids):
-        movies = [MovieModel.objects.get(id=movie_id) for movie_id in movie_ids]
-        actor = ActorModel(name=name, movies=[movie.title for movie in movies])
-        for movie in movies:
-            movie.actors.add(actor.id)
-            movie.save()
+        movie_ids = existing_ids(MovieModel, movie_ids, "Movie")
+        actor = ActorModel(name=name, movies=movie_ids)
         actor.save()
+        set_actor_movies(actor.id, [], movie_ids)
+        invalidate('actors', 'movies', *(f'movie:{movie_id}' for movie_id in movie_ids))
         return CreateActor(actor=actor)
     
 class DeleteActor(graphene.Mutation):
@@ -34,13 +69,11 @@ class DeleteActor(graphene.Mutation):
 
     def mutate(self, info, actor_id):
         try:
-            actor = ActorModel.objects.get(id=actor_id)
-            for movie_id in actor.movies:
-                movie = MovieModel.objects(id=movie_id).first()
-                if movie and actor.id in movie.actors:
-                    movie.actors.remove(actor.id)
-                    movie.save()
+            actor = ActorModel.objects.only('id', 'movies').get(id=actor_id)
+            movie_ids = reference_ids(actor, 'movies')
             actor.delete()
+            set_actor_movies(actor.id, movie_ids, [])
+            invalidate(f'actor:{actor_id}', 'actors', 'movies', *(f'movie:{movie_id}' for movie_id in movie_ids))
             success = True
         except ActorModel.DoesNotExist:
             success = False
@@ -57,36 +90,28 @@ class EditActor(graphene.Mutation):
 
     def mutate(self, info, actor_id, name=None, movie_ids=None):
         actor = ActorModel.objects(id=actor_id).first()
-        new_movies = [MovieModel.objects.get(id=movie_id) for movie_id in movie_ids]
         if not actor:
             raise Exception("Actor not found")
+        current_movie_ids = reference_ids(actor, 'movies')
         if name:
             actor.name = name 
-        if new_movies is not None:
-            current_movies = set(actor.movies)
-            new_movies_set = set(new_movies)
-            
-            movies_to_remove = current_movies - new_movies_set
-            for movie_id in movies_to_remove:
-                movie = MovieModel.objects(id=movie_id).first()
-                if movie and actor.id in movie.actors:
-                    movie.actors.remove(actor.id)
-                    movie.save()
-            
-            movies_to_add = new_movies_set - current_movies
-            for movie_id in movies_to_add:
-                movie = MovieModel.objects.get_or_create(id=movie_id)
-                if actor.id not in movie.actors:
-                    movie.actors.append(actor.id)
-                movie.save()
-            
-            actor.movies = new_movies
-
+        changed_movie_ids = set()
+        if movie_ids is not None:
+            # The movies' cast is the source of truth, so it is written first.
+            movie_ids = existing_ids(MovieModel, movie_ids, "Movie")
+            changed_movie_ids = set_actor_movies(actor.id, current_movie_ids, movie_ids)
+            actor.movies = movie_ids
         actor.save()
+        if name:
+            # Cached movies embed the cast's names, not only the changed links.
+            changed_movie_ids |= set(current_movie_ids)
+        invalidate(f'actor:{actor_id}', 'actors', 'movies', *(f'movie:{movie_id}' for movie_id in changed_movie_ids))
         return EditActor(actor=actor)
 
 class Query(graphene.ObjectType):
     all_actors = graphene.List(ActorType, query=String(), limit=Int(), skip=Int())
+    actors_page = graphene.Field(ActorPage, query=String(), limit=Int(), skip=Int())
+    all_actors_connection = graphene.Field(ActorConnection, query=String(), first=Int(), after=String(), last=Int(), before=String())
     movies_by_actor = graphene.List(MovieType, actor_id=String(required=True), limit=Int(), skip=Int(), genre=String())
     search_movies_by_actor = graphene.List(MovieType, actor_id=String(required=True), query=String(required=True), limit=Int(), skip=Int(), genre=String())
     actors_count = graphene.Int()
@@ -96,74 +121,60 @@ class Query(graphene.ObjectType):
     search_movie_actor_count = graphene.Int(actor_id=graphene.String(required=True), query=String(required=True), genre=String())
     
     def resolve_all_actors(self, info, query=None, limit=None, skip=None):
-        actor_query = ActorModel.objects
+        actor_query = project(ActorModel.objects, info)
         if query:
-            actor_query = actor_query.filter(name__icontains=query)
+            actor_query = search(actor_query, query)
         if skip:
             actor_query = actor_query.skip(skip)
         if limit:
             actor_query = actor_query.limit(limit)
         return list(actor_query)
 
+    def resolve_actors_page(self, info, query=None, limit=None, skip=None):
+        actor_query = ActorModel.objects
+        if query:
+            actor_query = search(actor_query, query)
+        return facet_page(actor_query, info, ActorPage, skip, limit)
+
+    def resolve_all_actors_connection(self, info, query=None, first=None, after=None, last=None, before=None):
+        actor_query = ActorModel.objects
+        if query:
+            actor_query = search(actor_query, query)
+        return paginate(actor_query, info, ActorConnection, first, after, last, before)
+
     def resolve_movies_by_actor(self, info, actor_id, limit=None, skip=None, genre=None):
-        actor = ActorModel.objects.filter(id=actor_id).first()
-        if not actor:
-            raise Exception("Actor not found")
-        movie_ids = [movie.id for movie in actor.movies]
-        query_set = MovieModel.objects.filter(id__in=movie_ids)
-        query_set = query_set.order_by('-id')
-        if genre:
-            query_set = query_set.filter(genres__icontains=genre)
+        query_set = project(movies_of_actor(actor_id, genre), info).order_by('-id')
         if skip:
             query_set = query_set.skip(skip)
         if limit:
             query_set = query_set.limit(limit)
-        return list(query_set)
+        return ensure_actor(actor_id, list(query_set))
         
     def resolve_search_movies_by_actor(self, info, actor_id, query, limit=None, skip=None, genre=None):
-        actor = ActorModel.objects.filter(id=actor_id).first()
-        if not actor:
-            raise Exception("Actor not found")
-        movie_ids = [movie.id for movie in actor.movies]
-        query_set = MovieModel.objects.filter(Q(id__in=movie_ids) & Q(title__icontains=query))
-        query_set = query_set.order_by('-id')
-        if genre:
-            query_set = query_set.filter(genres__icontains=genre)
+        query_set = project(search(movies_of_actor(actor_id, genre), query), info)
         if skip:
             query_set = query_set.skip(skip)
         if limit:
             query_set = query_set.limit(limit)
-        return list(query_set)
+        return ensure_actor(actor_id, list(query_set))
 
     def resolve_actors_count(self, info):
         return ActorModel.objects.count()
 
     def resolve_search_actors_count(self, info, query):
-        return ActorModel.objects.filter(name__icontains=query).count()
+        return search(ActorModel.objects, query).count()
 
     def resolve_fetch_actor(self, info, actor_id):
-        actor = ActorModel.objects(id=actor_id).first()
+        actor = project(ActorModel.objects(id=actor_id), info).first()
         if not actor:
             raise Exception("Actor not found")
         return actor
  
     def resolve_movie_actor_count(self, info, actor_id, genre=None):
-        actor = ActorModel.objects.filter(id=actor_id).first()
-        if not actor:
-            raise Exception("Actor not found")
-        movie_ids = [movie.id for movie in actor.movies]
-        query_set = MovieModel.objects.filter(id__in=movie_ids)
-        query_set.filter(genres__icontains=genre)
-        return query_set.count()
+        return ensure_actor(actor_id, movies_of_actor(actor_id, genre).count())
 
     def resolve_search_movie_actor_count(self, info, actor_id, query, genre=None):
-        actor = ActorModel.objects.filter(id=actor_id).first()
-        if not actor:
-            raise Exception("Actor not found")
-        movie_ids = [movie.id for movie in actor.movies]
-        query_set = MovieModel.objects.filter(id__in=movie_ids)
-        query_set.filter(Q(genres__icontains=genre) & Q(title__icontains=query))
-        return query_set.count()
+        return ensure_actor(actor_id, search(movies_of_actor(actor_id, genre), query).count())
     
 class Mutation(graphene.ObjectType):
     create_actor = CreateActor.Field()
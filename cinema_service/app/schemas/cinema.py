@@ -1,10 +1,16 @@
 import graphene
 from graphene_mongo import MongoengineObjectType
 from app.models.cinema import CinemaModel
+from app.models.rating import Rating, average_rating
 from graphene import String, Int, Field
 from mongoengine.queryset.visitor import Q
 from ..models.cinema import WorkingDay
 from ..models.seat import Seat,SeatGroup,SeatGroupType,SeatType
+from .projection import project
+from .pagination import paginate, facet_page, CountedConnection
+from app.util.search import search
+from app.util.response_cache import invalidate
+from app.util.hot_documents import hot_cache
 
 class WorkingDayInput(graphene.InputObjectType):
     day = graphene.String()
@@ -30,8 +36,25 @@ class SeatGroupInput(graphene.InputObjectType):
 class CinemaType(MongoengineObjectType):
     class Meta:
         model = CinemaModel
+        exclude_fields = ('search_keywords', 'rating_sum')
+    rating = graphene.Float()
+    rated_by = graphene.Boolean(user_id=graphene.String(required=True))
     working_days = graphene.List(WorkingDayType)
     seat_groups = graphene.List(SeatGroupType)
+
+    def resolve_rating(self, info):
+        return average_rating(self)
+
+    def resolve_rated_by(self, info, user_id):
+        return Rating.has_rated('cinema', self.id, user_id)
+
+class CinemaConnection(CountedConnection):
+    class Meta:
+        node = CinemaType
+
+class CinemaPage(graphene.ObjectType):
+    items = graphene.List(CinemaType)
+    total_count = graphene.Int()
     
 class CreateCinema(graphene.Mutation):
     class Arguments:
@@ -46,12 +69,6 @@ class CreateCinema(graphene.Mutation):
     def mutate(self, info, name, location, imageUrl, working_days, seat_groups=None):
         if working_days:
             for wd in working_days:
-                if isinstance(wd.day, str):
-                    wd.day = eval(wd.day)[1]
-                if isinstance(wd.start_time, str):
-                    wd.start_time = eval(wd.start_time)[1]
-                if isinstance(wd.end_time, str):
-                    wd.end_time = eval(wd.end_time)[1]
                 if wd.day not in ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]:
                     raise ValueError(f"Invalid day value: {wd.day}")
                 
@@ -77,6 +94,7 @@ class CreateCinema(graphene.Mutation):
             ) for sg in seat_groups] if seat_groups else []
         )
         cinema.save()
+        invalidate('cinemas')
         return CreateCinema(cinema=cinema)  
 class DeleteCinema(graphene.Mutation):
     class Arguments:
@@ -88,6 +106,7 @@ class DeleteCinema(graphene.Mutation):
         cinema = CinemaModel.objects(id=cinema_id).first()
         if cinema:
             cinema.delete()
+            invalidate(f'cinema:{cinema_id}', 'cinemas')
             return DeleteCinema(success=True)
         return DeleteCinema(success=False) 
 class EditCinema(graphene.Mutation):
@@ -104,12 +123,6 @@ class EditCinema(graphene.Mutation):
         try:
             if new_working_days:
                 for wd in new_working_days:
-                    if isinstance(wd.day, str):
-                        wd.day = eval(wd.day)[1]
-                    if isinstance(wd.start_time, str):
-                        wd.start_time = eval(wd.start_time)[1]
-                    if isinstance(wd.end_time, str):
-                        wd.end_time = eval(wd.end_time)[1]
                     if wd.day not in ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]:
                         raise ValueError(f"Invalid day value: {wd.day}")
                     
@@ -137,6 +150,7 @@ class EditCinema(graphene.Mutation):
                 ] if new_seat_groups else []
             print(new_seat_groups)
             cinema.save()
+            invalidate(f'cinema:{cinema_id}', 'cinemas')
             success = True
         except CinemaModel.DoesNotExist:
             success = False
@@ -151,45 +165,53 @@ class RateCinema(graphene.Mutation):
     success = graphene.Boolean()
 
     def mutate(self, info, cinema_id, rating, user_id):
-        cinema = CinemaModel.objects(id=cinema_id).first()
-
-        if user_id in cinema.ratedBy:
+        rated = Rating.rate(CinemaModel, 'cinema', cinema_id, user_id, rating)
+        if rated is None:
+            return RateCinema(success=False)
+        if not rated:
             raise Exception("You have already rated this cinema.")
-
-        if cinema:
-            cinema.update_rating(rating, user_id)
-            return RateCinema(success=True)
-        return RateCinema(success=False)
+        invalidate(f'cinema:{cinema_id}', 'cinemas')
+        return RateCinema(success=True)
 class Query(graphene.ObjectType):
     all_cinemas = graphene.List(CinemaType, limit=Int(), skip=Int())
     fetch_cinema = graphene.Field(CinemaType, cinema_id=graphene.String(required=True))
     search_cinemas = graphene.List(CinemaType, query=String(required=True), limit=Int(), skip=Int())
     cinema_count = graphene.Int()
     search_cinema_count = graphene.Int(query=String(required=True))
+    cinemas_page = graphene.Field(CinemaPage, query=String(), limit=Int(), skip=Int())
+    all_cinemas_connection = graphene.Field(CinemaConnection, first=Int(), after=String(), last=Int(), before=String())
+    search_cinemas_connection = graphene.Field(CinemaConnection, query=String(required=True), first=Int(), after=String(), last=Int(), before=String())
 
     def resolve_all_cinemas(self, info, limit=None, skip=None):
-        query = CinemaModel.objects
+        query = project(CinemaModel.objects, info)
         if skip:
             query = query.skip(skip)
         if limit:
             query = query.limit(limit)
         return list(query)
     
+    def resolve_cinemas_page(self, info, query=None, limit=None, skip=None):
+        query_set = CinemaModel.objects
+        if query:
+            query_set = search(query_set, query)
+        return facet_page(query_set, info, CinemaPage, skip, limit)
+
+    def resolve_all_cinemas_connection(self, info, first=None, after=None, last=None, before=None):
+        return paginate(CinemaModel.objects, info, CinemaConnection, first, after, last, before)
+
+    def resolve_search_cinemas_connection(self, info, query, first=None, after=None, last=None, before=None):
+        query_set = search(CinemaModel.objects, query)
+        return paginate(query_set, info, CinemaConnection, first, after, last, before)
+    
     def resolve_fetch_cinema(self, info, cinema_id):
-        cinema = CinemaModel.objects(id=cinema_id).first()
+        cinema = hot_cache(CinemaModel).get(cinema_id)
         if not cinema:
             raise Exception(f"Cinema with id {cinema_id} not found")
         return cinema
     
     def resolve_search_cinemas(self, info, query, limit=None, skip=None):
-        if not query.isnumeric():
-            query_set = CinemaModel.objects.filter(
-                Q(name__icontains=query) | Q(location__icontains=query) 
-            )
-        else:
-            query_set = CinemaModel.objects.filter(
-                Q(name__icontains=query) | Q(location__icontains=query)
-            )
+        query_set = search(CinemaModel.objects, query)
+        query_set = project(query_set, info)
         if skip:
             query_set = query_set.skip(skip)
         if limit:
@@ -200,9 +222,7 @@ class Query(graphene.ObjectType):
         return CinemaModel.objects.count()
     
     def resolve_search_cinema_count(self, info, query):
-        query_set = CinemaModel.objects.filter(
-            Q(name__icontains=query) | Q(location__icontains=query)
-        )
+        query_set = search(CinemaModel.objects, query)
         return query_set.count()   
 class Mutation(graphene.ObjectType):
     create_cinema = CreateCinema.Field()
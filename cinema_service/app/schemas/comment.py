@@ -0,0 +1,46 @@
+import base64
+import graphene
+from graphene.relay import PageInfo
+from graphene_mongo import MongoengineObjectType
+from bson import ObjectId
+from bson.errors import InvalidId
+from app.models.comment import CommentModel
+from .pagination import CountedConnection, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from .projection import requested_fields
+
+class CommentType(MongoengineObjectType):
+    class Meta:
+        model = CommentModel
+        exclude_fields = ('movie_id',)
+
+class CommentConnection(CountedConnection):
+    class Meta:
+        node = CommentType
+
+def encode_comment_cursor(comment):
+    return base64.urlsafe_b64encode(f"comment:{comment.timestamp!r}:{comment.id}".encode()).decode()
+
+def decode_comment_cursor(cursor):
+    try:
+        prefix, timestamp, comment_id = base64.urlsafe_b64decode(cursor.encode()).decode().split(':', 2)
+        if prefix != 'comment':
+            raise ValueError(cursor)
+        return float(timestamp), ObjectId(comment_id)
+    except (ValueError, TypeError, InvalidId, UnicodeDecodeError):
+        raise Exception(f"Invalid cursor {cursor}")
+
+def comments_connection(info, movie_id, first=None, after=None):
+    size = min(max(first or DEFAULT_PAGE_SIZE, 1), MAX_PAGE_SIZE)
+    comments = CommentModel.page(movie_id, size + 1, decode_comment_cursor(after) if after else None)
+    has_more = len(comments) > size
+    edges = [CommentConnection.Edge(node=comment, cursor=encode_comment_cursor(comment)) for comment in comments[:size]]
+    return CommentConnection(
+        edges=edges,
+        total_count=CommentModel.count(movie_id) if 'totalCount' in requested_fields(info) else None,
+        page_info=PageInfo(
+            has_next_page=has_more,
+            has_previous_page=after is not None,
+            start_cursor=edges[0].cursor if edges else None,
+            end_cursor=edges[-1].cursor if edges else None,
+        ),
+    )
@@ -0,0 +1,111 @@
+from graphql.language.ast import FragmentSpread, InlineFragment, IntValue, OperationDefinition, Variable
+from graphql.type.definition import GraphQLList, GraphQLNonNull, get_named_type, is_composite_type
+from .pagination import DEFAULT_PAGE_SIZE
+from ..models.showtime import SCHEDULE_DAYS
+
+SIZE_ARGUMENTS = ('limit', 'first', 'last', 'count')
+UNBOUNDED_LIST_SIZE = 1000
+NESTED_LIST_SIZE = 20
+PAGE_ITEM_FIELDS = ('items', 'edges')
+
+# Known sizes for lists that take no size argument.
+LIST_SIZES = {
+    'allTickets': UNBOUNDED_LIST_SIZE,
+    'schedules': 1,
+    'scheduleDays': len(SCHEDULE_DAYS),
+}
+
+# Extra weight for fields whose resolvers do more than a plain document read.
+FIELD_WEIGHTS = {
+    'seats': 5,
+    'randomMovies': 5,
+    'comments': 2,
+}
+
+# Static cost of an operation, computed from the document before it runs. Each
+# composite field costs its weight, multiplied by how many items it can return:
+# the `limit`/`first`/`last`/`count` argument when one is given, the default
+# page size for cursor connections, and a pessimistic size for paged lists
+# asked for without a limit. Nested lists multiply, so the cost of
+# `allActors { movies { actors } }` grows with every level, as its reads do.
+def analyze(schema, document_ast, operation_name=None, variables=None):
+    operation = find_operation(document_ast, operation_name)
+    if operation is None:
+        return 0, 0
+    fragments = {
+        definition.name.value: definition
+        for definition in document_ast.definitions
+        if not isinstance(definition, OperationDefinition)
+    }
+    root = {
+        'query': schema.get_query_type,
+        'mutation': schema.get_mutation_type,
+        'subscription': schema.get_subscription_type,
+    }[operation.operation]()
+    return selection_cost(schema, root, operation.selection_set, fragments, variables or {}, root=True)
+
+def find_operation(document_ast, operation_name):
+    operations = [definition for definition in document_ast.definitions if isinstance(definition, OperationDefinition)]
+    if operation_name:
+        operations = [operation for operation in operations if operation.name and operation.name.value == operation_name]
+    return operations[0] if len(operations) == 1 else None
+
+def selection_cost(schema, parent_type, selection_set, fragments, variables, root=False):
+    cost = depth = 0
+    for field, field_parent in collect_fields(schema, parent_type, selection_set, fragments):
+        field_def = getattr(field_parent, 'fields', {}).get(field.name.value)
+        if field_def is None:
+            continue
+        field_type = get_named_type(field_def.type)
+        if field.selection_set is None or not is_composite_type(field_type):
+            cost += FIELD_WEIGHTS.get(field.name.value, 1 if root else 0)
+            continue
+        child_cost, child_depth = selection_cost(schema, field_type, field.selection_set, fragments, variables)
+        weight = FIELD_WEIGHTS.get(field.name.value, 1)
+        cost += list_size(field, field_def, variables) * (weight + child_cost)
+        depth = max(depth, child_depth + 1)
+    return cost, depth
+
+def collect_fields(schema, parent_type, selection_set, fragments):
+    for selection in selection_set.selections:
+        if isinstance(selection, FragmentSpread):
+            fragment = fragments.get(selection.name.value)
+            if fragment:
+                fragment_type = schema.get_type(fragment.type_condition.name.value) or parent_type
+                yield from collect_fields(schema, fragment_type, fragment.selection_set, fragments)
+        elif isinstance(selection, InlineFragment):
+            fragment_type = parent_type
+            if selection.type_condition:
+                fragment_type = schema.get_type(selection.type_condition.name.value) or parent_type
+            yield from collect_fields(schema, fragment_type, selection.selection_set, fragments)
+        else:
+            yield selection, parent_type
+
+def list_size(field, field_def, variables):
+    for argument in field.arguments or []:
+        if argument.name.value in SIZE_ARGUMENTS:
+            value = argument_value(argument.value, variables)
+            if value is not None:
+                return max(value, 1)
+    if field.name.value in LIST_SIZES:
+        return LIST_SIZES[field.name.value]
+    if 'first' in field_def.args or 'last' in field_def.args:
+        return DEFAULT_PAGE_SIZE
+    if 'limit' in field_def.args:
+        return UNBOUNDED_LIST_SIZE
+    if field.name.value in PAGE_ITEM_FIELDS or not is_list(field_def.type):
+        return 1
+    return NESTED_LIST_SIZE
+
+def argument_value(value, variables):
+    if isinstance(value, Variable):
+        value = variables.get(value.name.value)
+        return value if isinstance(value, int) else None
+    if isinstance(value, IntValue):
+        return int(value.value)
+    return None
+
+def is_list(field_type):
+    while isinstance(field_type, GraphQLNonNull):
+        field_type = field_type.of_type
+    return isinstance(field_type, GraphQLList)
@@ -0,0 +1,63 @@
+import threading
+from collections import OrderedDict
+from functools import partial
+from graphql.backend.base import GraphQLDocument
+from graphql.backend.core import GraphQLCoreBackend
+from graphql.execution import execute
+from graphql.execution.base import ExecutionResult
+from graphql.language.parser import parse
+from graphql.validation import validate
+
+DOCUMENT_CACHE_SIZE = 256
+
+class InvalidDocument(Exception):
+    pass
+
+class DocumentCache(GraphQLCoreBackend):
+    # Parses and validates a document once and keeps the result. Registered
+    # operations are pinned for the life of the process; any other document
+    # text goes through a bounded LRU so ad-hoc clients cannot grow it forever.
+    def __init__(self, max_size=DOCUMENT_CACHE_SIZE):
+        super().__init__()
+        self.max_size = max_size
+        self.lock = threading.Lock()
+        self.pinned = {}
+        self.documents = OrderedDict()
+
+    def register(self, schema, document_string):
+        document, errors = self.build(schema, document_string)
+        if errors:
+            raise InvalidDocument('; '.join(str(error) for error in errors))
+        self.pinned[document_string] = document
+        return document
+
+    def build(self, schema, document_string):
+        document_ast = parse(document_string)
+        errors = validate(schema, document_ast)
+        if errors:
+            run = lambda *args, **kwargs: ExecutionResult(errors=errors, invalid=True)
+        else:
+            run = partial(execute, schema, document_ast, **{
+                name: value for name, value in self.execute_params.items() if value is not None
+            })
+        return GraphQLDocument(schema=schema, document_string=document_string, document_ast=document_ast, execute=run), errors
+
+    def document_from_string(self, schema, document_string):
+        document = self.pinned.get(document_string)
+        if document:
+            return document
+        with self.lock:
+            document = self.documents.get(document_string)
+            if document:
+                self.documents.move_to_end(document_string)
+                return document
+
+        document, errors = self.build(schema, document_string)
+        if not errors:
+            with self.lock:
+                self.documents[document_string] = document
+                if len(self.documents) > self.max_size:
+                    self.documents.popitem(last=False)
+        return document
+
+document_cache = DocumentCache()
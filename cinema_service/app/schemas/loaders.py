@@ -0,0 +1,60 @@
+from flask import g, has_app_context
+from promise import Promise
+from promise.dataloader import DataLoader
+from ..models.actor import ActorModel
+from ..models.movie import MovieModel
+from ..models.cinema import CinemaModel
+from ..util.hot_documents import hot_cache
+
+class DocumentLoader(DataLoader):
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def batch_load_fn(self, keys):
+        documents = {document.id: document for document in self.model.objects(id__in=keys)}
+        return Promise.resolve([documents.get(key) for key in keys])
+
+class HotDocumentLoader(DataLoader):
+    # Batches like DocumentLoader, but serves movies and cinemas from the
+    # per-process hot document cache and only reads the ones it is missing.
+    def __init__(self, model):
+        super().__init__()
+        self.cache = hot_cache(model)
+
+    def batch_load_fn(self, keys):
+        documents = self.cache.get_many(keys)
+        return Promise.resolve([documents.get(key) for key in keys])
+
+class Loaders:
+    def __init__(self):
+        self.actors = DocumentLoader(ActorModel)
+        self.movies = HotDocumentLoader(MovieModel)
+        self.cinemas = HotDocumentLoader(CinemaModel)
+
+def get_loaders(info):
+    # One set of loaders per GraphQLView request (context is the flask request),
+    # falling back to flask.g for schema.execute calls made from the admin routes.
+    context = info.context
+    if context is None:
+        if not has_app_context():
+            return Loaders()
+        context = g
+    if isinstance(context, dict):
+        return context.setdefault('loaders', Loaders())
+    loaders = getattr(context, 'loaders', None)
+    if loaders is None:
+        loaders = Loaders()
+        setattr(context, 'loaders', loaders)
+    return loaders
+
+def reference_id(document, field_name):
+    # Read the stored DBRef without letting mongoengine dereference it.
+    value = document._data.get(field_name)
+    return value.id if value is not None else None
+
+def reference_ids(document, field_name):
+    return [getattr(value, 'id', value) for value in document._data.get(field_name) or [] if value is not None]
+
+def load_many(loader, keys):
+    return loader.load_many(keys).then(lambda documents: [document for document in documents if document is not None])
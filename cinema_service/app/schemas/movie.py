@@ -1,24 +1,54 @@
 import graphene
 from graphene_mongo import MongoengineObjectType
-from app.models.movie import MovieModel, Comment
+from app.models.movie import MovieModel
+from app.models.comment import CommentModel
 from app.models.user import UserModel
 from graphene import String, Int, Field, List, ID
 from mongoengine.queryset.visitor import Q
 from mongoengine import DoesNotExist
-import random
 from app.models.actor import ActorModel
-
-class CommentType(MongoengineObjectType):
-    class Meta:
-        model = Comment
+from app.models.rating import Rating, average_rating
+from .loaders import get_loaders, load_many, reference_ids
+from .projection import project
+from .pagination import paginate, facet_page, CountedConnection, MAX_PAGE_SIZE
+from .sampling import sample, get_sample_pool
+from .comment import CommentType, CommentConnection, comments_connection
+from app.util.search import search
+from app.util.response_cache import invalidate, tag
+from app.util.hot_documents import hot_cache
+from app.util.relationships import existing_ids, set_movie_actors
 
 class MovieType(MongoengineObjectType):
     class Meta:
         model = MovieModel
-    comments = graphene.List(CommentType)
+        exclude_fields = ('search_keywords', 'rating_sum')
+    rating = graphene.Float()
+    rated_by = graphene.Boolean(user_id=graphene.String(required=True))
+    comments = graphene.Field(CommentConnection, first=Int(), after=String())
     actors = graphene.List(lambda: ActorType)
 
+    def resolve_rating(self, info):
+        return average_rating(self)
+
+    def resolve_rated_by(self, info, user_id):
+        return Rating.has_rated('movie', self.id, user_id)
+
+    def resolve_comments(self, info, first=None, after=None):
+        tag(f'comments:{self.id}')
+        return comments_connection(info, self.id, first, after)
+
+    def resolve_actors(self, info):
+        return load_many(get_loaders(info).actors, reference_ids(self, 'actors'))
+
 from .actor import ActorType
+
+class MovieConnection(CountedConnection):
+    class Meta:
+        node = MovieType
+
+class MoviePage(graphene.ObjectType):
+    items = graphene.List(MovieType)
+    total_count = graphene.Int()
   
 class CreateMovie(graphene.Mutation):
     class Arguments:
@@ -32,8 +62,8 @@ class CreateMovie(graphene.Mutation):
 
     movie = Field(lambda: MovieType)
 
-    def mutate(self, info, title, genres, duration, poster_url, video_url, description, actor_ids):
-        actors = [ActorModel.objects.get(id=actor_id) for actor_id in actor_ids]
+    def mutate(self, info, title, genres, duration, poster_url, video_url, description, actor_ids=None):
+        actor_ids = existing_ids(ActorModel, actor_ids, "Actor")
         movie = MovieModel(
             title=title,
             genres=genres,
@@ -41,13 +71,11 @@ class CreateMovie(graphene.Mutation):
             poster_url=poster_url,
             video_url=video_url,
             description=description,
-            actors=actors
+            actors=actor_ids
         )
-        for actor in actors:
-            if actor:
-                actor.movies.append(movie.id)
-                actor.save()
         movie.save()
+        set_movie_actors(movie.id, [], actor_ids)
+        invalidate('movies', 'actors', *(f'actor:{actor_id}' for actor_id in actor_ids))
         return CreateMovie(movie=movie)
 
 class DeleteMovie(graphene.Mutation):
@@ -58,13 +86,11 @@ class DeleteMovie(graphene.Mutation):
 
     def mutate(self, info, movie_id):
         try:
-            movie = MovieModel.objects.get(id=movie_id)
-            for actor_id in movie.actors:
-                actor = ActorModel.objects(id=actor_id).first()
-                if actor and movie.id in actor.movies:
-                    actor.movies.remove(movie.id)
-                    actor.save()
+            movie = MovieModel.objects.only('id', 'actors').get(id=movie_id)
+            actor_ids = reference_ids(movie, 'actors')
             movie.delete()
+            set_movie_actors(movie.id, actor_ids, [])
+            invalidate(f'movie:{movie_id}', 'movies', 'actors', *(f'actor:{actor_id}' for actor_id in actor_ids))
             success = True
         except MovieModel.DoesNotExist:
             success = False
@@ -87,7 +113,7 @@ class EditMovie(graphene.Mutation):
     def mutate(self, info, movie_id, new_title=None, new_genres=None, new_duration=None, new_poster_url=None, new_video_url=None, new_description=None, new_actor_ids=None):
         try:
             movie = MovieModel.objects.get(id=movie_id)
-            new_actors = [ActorModel.object.get(id=aid) for aid in new_actor_ids]
+            current_actor_ids = reference_ids(movie, 'actors')
             if new_title:
                 movie.title = new_title
             if new_genres:
@@ -100,26 +126,14 @@ class EditMovie(graphene.Mutation):
                 movie.video_url = new_video_url
             if new_description:
                 movie.description = new_description
-            if new_actors is not None:
-                current_actors = set(movie.actors)
-                new_actors_set = set(new_actors)
-                
-                actors_to_remove = current_actors - new_actors_set
-                for actor_id in actors_to_remove:
-                    actor = ActorModel.objects(id=actor_id).first()
-                    if actor and movie.id in actor.movies:
-                        actor.movies.remove(movie.id)
-                        actor.save()
-                
-                actors_to_add = new_actors_set - current_actors
-                for actor_id in actors_to_add:
-                    actor = ActorModel.objects.get_or_create(id=actor_id)
-                    if movie.id not in actor.movies:
-                        actor.movies.append(movie.id)
-                    actor.save()
-                
-                movie.actors = new_actors
+            changed_actor_ids = set()
+            if new_actor_ids is not None:
+                actor_ids = existing_ids(ActorModel, new_actor_ids, "Actor")
+                movie.actors = actor_ids
             movie.save()
+            if new_actor_ids is not None:
+                changed_actor_ids = set_movie_actors(movie.id, current_actor_ids, actor_ids)
+            invalidate(f'movie:{movie_id}', 'movies', 'actors', *(f'actor:{actor_id}' for actor_id in changed_actor_ids))
             success = True
         except MovieModel.DoesNotExist:
             success = False
@@ -135,15 +149,13 @@ class RateMovie(graphene.Mutation):
     success = graphene.Boolean()
 
     def mutate(self, info, movie_id, rating, user_id):
-        movie = MovieModel.objects(id=movie_id).first()
-
-        if user_id in movie.ratedBy:
+        rated = Rating.rate(MovieModel, 'movie', movie_id, user_id, rating)
+        if rated is None:
+            return RateMovie(success=False)
+        if not rated:
             raise Exception("You have already rated this movie.")
-
-        if movie:
-            movie.update_rating(rating, user_id)
-            return RateMovie(success=True)
-        return RateMovie(success=False)
+        invalidate(f'movie:{movie_id}', 'movies')
+        return RateMovie(success=True)
 
 class AddCommentMutation(graphene.Mutation):
     class Arguments:
@@ -153,12 +165,12 @@ class AddCommentMutation(graphene.Mutation):
 
     success = graphene.Boolean()
     movie = Field(MovieType)
+    comment = Field(CommentType)
     error = String()
 
     def mutate(self, info, movie_id, username, content):
-        try:
-            movie = MovieModel.objects.get(id=movie_id)
-        except DoesNotExist:
+        movie = hot_cache(MovieModel).get(movie_id)
+        if not movie:
             return AddCommentMutation(success=False, error="Movie not found")
 
         try:
@@ -166,8 +178,9 @@ class AddCommentMutation(graphene.Mutation):
         except DoesNotExist:
             return AddCommentMutation(success=False, error="User not found")
 
-        movie.add_comment(username, content)
-        return AddCommentMutation(success=True, movie=movie)
+        comment = CommentModel.add(movie.id, username, content)
+        invalidate(f'comments:{movie.id}')
+        return AddCommentMutation(success=True, movie=movie, comment=comment)
 
 class Query(graphene.ObjectType):
     all_movies_page = graphene.List(MovieType, limit=Int(), skip=Int(), genre=String())
@@ -175,30 +188,51 @@ class Query(graphene.ObjectType):
     search_movies_page = graphene.List(MovieType, query=String(required=True), limit=Int(), skip=Int(), genre=String())
     movie_count = graphene.Int(genre=String())
     search_movie_count = graphene.Int(query=String(required=True), genre=String())
-    random_movies = graphene.List(MovieType, count=Int(required=True))
+    random_movies = graphene.List(MovieType, count=Int(required=True), genre=String())
+    movies_page = graphene.Field(MoviePage, query=String(), limit=Int(), skip=Int(), genre=String())
+    all_movies_connection = graphene.Field(MovieConnection, first=Int(), after=String(), last=Int(), before=String(), genre=String())
+    search_movies_connection = graphene.Field(MovieConnection, query=String(required=True), first=Int(), after=String(), last=Int(), before=String(), genre=String())
 
     def resolve_all_movies_page(self, info, limit=None, skip=None, genre=None):
-        query = MovieModel.objects.order_by('-id')
+        query = project(MovieModel.objects.order_by('-id'), info)
         if genre:
-            query = query.filter(genres__icontains=genre)
+            query = query.filter(genres=genre)
         if skip:
             query = query.skip(skip)
         if limit:
             query = query.limit(limit)
         return list(query)
 
+    def resolve_movies_page(self, info, query=None, limit=None, skip=None, genre=None):
+        query_set = MovieModel.objects.order_by('-id')
+        if query:
+            query_set = search(query_set, query)
+        if genre:
+            query_set = query_set.filter(genres=genre)
+        return facet_page(query_set, info, MoviePage, skip, limit)
+
+    def resolve_all_movies_connection(self, info, first=None, after=None, last=None, before=None, genre=None):
+        query = MovieModel.objects
+        if genre:
+            query = query.filter(genres=genre)
+        return paginate(query, info, MovieConnection, first, after, last, before, descending=True)
+
+    def resolve_search_movies_connection(self, info, query, first=None, after=None, last=None, before=None, genre=None):
+        query_set = search(MovieModel.objects, query)
+        if genre:
+            query_set = query_set.filter(genres=genre)
+        return paginate(query_set, info, MovieConnection, first, after, last, before, descending=True)
+
     def resolve_fetch_movie(self, info, movie_id):
-        movie = MovieModel.objects(id=movie_id).first()
+        movie = hot_cache(MovieModel).get(movie_id)
         if not movie:
             raise Exception(f"Movie with id {movie_id} not found")
         return movie
 
     def resolve_search_movies_page(self, info, query, limit=None, skip=None, genre=None):
-        query_set = MovieModel.objects.order_by('-id').filter(
-            Q(title__icontains=query)
-        )
+        query_set = project(search(MovieModel.objects, query), info)
         if genre:
-            query_set = query_set.filter(genres__icontains=genre)
+            query_set = query_set.filter(genres=genre)
         if skip:
             query_set = query_set.skip(skip)
         if limit:
@@ -208,21 +242,26 @@ class Query(graphene.ObjectType):
     def resolve_movie_count(self, info, genre=None):
         query = MovieModel.objects
         if genre:
-            query = query.filter(genres__icontains=genre)
+            query = query.filter(genres=genre)
         return query.count()
 
     def resolve_search_movie_count(self, info, query, genre=None):
-        query_set = MovieModel.objects.filter(
-            Q(title__icontains=query)
-        )
+        query_set = search(MovieModel.objects, query)
         if genre:
-            query_set = query_set.filter(genres__icontains=genre)
+            query_set = query_set.filter(genres=genre)
         return query_set.count()
 
-    def resolve_random_movies(self, info, count):
-        movies = list(MovieModel.objects.all())
-        random.shuffle(movies)
-        return movies[:count]
+    def resolve_random_movies(self, info, count, genre=None):
+        count = min(max(count, 1), MAX_PAGE_SIZE)
+        query_set = MovieModel.objects
+        if genre:
+            query_set = query_set.filter(genres=genre)
+        pool = get_sample_pool()
+        if pool:
+            movie_ids = pool.take(('movies', genre), query_set, count)
+            movies = hot_cache(MovieModel).get_many(movie_ids)
+            return [movies[movie_id] for movie_id in movie_ids if movie_id in movies]
+        return sample(project(query_set, info), count)
 
 class Mutation(graphene.ObjectType):
     create_movie = CreateMovie.Field()
@@ -0,0 +1,187 @@
+import base64
+import time
+import graphene
+from bson import ObjectId
+from bson.errors import InvalidId
+from graphene.relay import PageInfo
+from .projection import project, requested_fields
+
+DEFAULT_PAGE_SIZE = 10
+MAX_PAGE_SIZE = 100
+NODE_PATH = ('edges', 'node')
+COUNT_CACHE_SECONDS = 30
+MAX_CACHED_COUNTS = 1000
+
+_estimated_counts = {}
+_filtered_counts = {}
+
+class CountedConnection(graphene.relay.Connection):
+    class Meta:
+        abstract = True
+    total_count = graphene.Int()
+
+def encode_cursor(document_id):
+    return base64.urlsafe_b64encode(f"cursor:{document_id}".encode()).decode()
+
+def decode_cursor(cursor):
+    try:
+        prefix, document_id = base64.urlsafe_b64decode(cursor.encode()).decode().split(':', 1)
+        if prefix != 'cursor':
+            raise ValueError(cursor)
+        return ObjectId(document_id)
+    except (ValueError, TypeError, InvalidId, UnicodeDecodeError):
+        raise Exception(f"Invalid cursor {cursor}")
+
+def encode_ranked_cursor(score, document_id):
+    return base64.urlsafe_b64encode(f"ranked:{score!r}:{document_id}".encode()).decode()
+
+def decode_ranked_cursor(cursor):
+    try:
+        prefix, score, document_id = base64.urlsafe_b64decode(cursor.encode()).decode().split(':', 2)
+        if prefix != 'ranked':
+            raise ValueError(cursor)
+        return float(score), ObjectId(document_id)
+    except (ValueError, TypeError, InvalidId, UnicodeDecodeError):
+        raise Exception(f"Invalid cursor {cursor}")
+
+def is_ranked(queryset):
+    return '_text_score' in dict(queryset._ordering or [])
+
+def ranked_page(queryset, size, cursor=None, backward=False):
+    # Search results keep their relevance order: the page is keyed on
+    # (textScore, _id), best match first, and returned with each score so the
+    # next cursor can continue from it.
+    model = queryset._document
+    pipeline = [{'$match': queryset._query}, {'$addFields': {'_text_score': {'$meta': 'textScore'}}}]
+    if cursor:
+        score, document_id = decode_ranked_cursor(cursor)
+        beyond = '$gt' if backward else '$lt'
+        pipeline.append({'$match': {'$or': [
+            {'_text_score': {beyond: score}},
+            {'_text_score': score, '_id': {beyond: document_id}},
+        ]}})
+    direction = 1 if backward else -1
+    pipeline += [{'$sort': {'_text_score': direction, '_id': direction}}, {'$limit': size}]
+    projection = queryset._loaded_fields.as_dict()
+    if projection:
+        pipeline.append({'$project': dict(projection, _text_score=1)})
+    return [(model._from_son(document), document['_text_score']) for document in model._get_collection().aggregate(pipeline)]
+
+def estimated_count(model):
+    # Unfiltered lists show an approximate total from collection metadata,
+    # refreshed at most every COUNT_CACHE_SECONDS instead of counting documents.
+    count, counted_at = _estimated_counts.get(model, (None, 0))
+    if count is None or time.monotonic() - counted_at > COUNT_CACHE_SECONDS:
+        count = model._get_collection().estimated_document_count()
+        _estimated_counts[model] = (count, time.monotonic())
+    return count
+
+def filtered_count(queryset):
+    # Filtered totals are counted separately from the page, so the page itself
+    # stays an indexed range scan; each filter's count is reused for
+    # COUNT_CACHE_SECONDS.
+    key = (queryset._document, repr(queryset._query))
+    count, counted_at = _filtered_counts.get(key, (None, 0))
+    if count is None or time.monotonic() - counted_at > COUNT_CACHE_SECONDS:
+        if len(_filtered_counts) >= MAX_CACHED_COUNTS:
+            _filtered_counts.clear()
+        count = queryset.count()
+        _filtered_counts[key] = (count, time.monotonic())
+    return count
+
+def forget_counts(tags):
+    # Called by invalidate(): a tag naming a collection (e.g. 'movies') drops
+    # this process's cached totals for that collection.
+    for model in list(_estimated_counts):
+        if model._get_collection_name() in tags:
+            _estimated_counts.pop(model, None)
+    for key in list(_filtered_counts):
+        if key[0]._get_collection_name() in tags:
+            _filtered_counts.pop(key, None)
+
+def facet(queryset, items_pipeline):
+    # Page and total count in one aggregation: the filter runs once and both
+    # facets read from its output instead of two separate collection scans.
+    model = queryset._document
+    pipeline = [{'$match': queryset._query}] if queryset._query else []
+    ordering = dict(queryset._ordering or [])
+    if '_text_score' in ordering:
+        pipeline.append({'$addFields': {'_text_score': {'$meta': 'textScore'}}})
+        ordering['_text_score'] = -1
+    if ordering:
+        items_pipeline = [{'$sort': ordering}] + items_pipeline
+    projection = queryset._loaded_fields.as_dict()
+    if projection:
+        items_pipeline = items_pipeline + [{'$project': projection}]
+    pipeline.append({'$facet': {'items': items_pipeline, 'totalCount': [{'$count': 'count'}]}})
+
+    result = next(model._get_collection().aggregate(pipeline), {})
+    items = [model._from_son(document) for document in result.get('items', [])]
+    total_count = result['totalCount'][0]['count'] if result.get('totalCount') else 0
+    return items, total_count
+
+def count_of(queryset):
+    # A queryset.none() (e.g. a search without any words) matches nothing,
+    # whatever filter it was built on.
+    if queryset._none:
+        return 0
+    return filtered_count(queryset) if queryset._query else estimated_count(queryset._document)
+
+def facet_page(queryset, info, page_type, skip=None, limit=None):
+    queryset = project(queryset, info, path=('items',))
+    if queryset._none:
+        return page_type(items=[], total_count=0)
+    if not queryset._query:
+        if skip:
+            queryset = queryset.skip(skip)
+        if limit:
+            queryset = queryset.limit(limit)
+        return page_type(items=list(queryset), total_count=estimated_count(queryset._document))
+
+    items_pipeline = []
+    if skip:
+        items_pipeline.append({'$skip': skip})
+    if limit:
+        items_pipeline.append({'$limit': limit})
+    items, total_count = facet(queryset, items_pipeline)
+    return page_type(items=items, total_count=total_count)
+
+def paginate(queryset, info, connection_type, first=None, after=None, last=None, before=None, descending=False):
+    # Keyset pagination on _id: every page is an indexed range scan, so page 500
+    # costs the same as page 1. `before`/`last` walk the same index backwards.
+    # Searches are paged by relevance instead, see ranked_page.
+    backward = before is not None or last is not None
+    size = min(max((last if backward else first) or DEFAULT_PAGE_SIZE, 1), MAX_PAGE_SIZE)
+    ascending = descending == backward
+    cursor = before if backward else after
+    ranked = is_ranked(queryset)
+    queryset = project(queryset, info, path=NODE_PATH)
+
+    total_count = count_of(queryset) if 'totalCount' in requested_fields(info) else None
+    if ranked:
+        items = ranked_page(queryset, size + 1, cursor, backward)
+    else:
+        queryset = queryset.order_by('id' if ascending else '-id')
+        if cursor:
+            queryset = queryset.filter(**{'id__gt' if ascending else 'id__lt': decode_cursor(cursor)})
+        items = list(queryset.limit(size + 1))
+
+    has_more = len(items) > size
+    items = items[:size]
+    if backward:
+        items.reverse()
+
+    if ranked:
+        edges = [connection_type.Edge(node=item, cursor=encode_ranked_cursor(score, item.id)) for item, score in items]
+    else:
+        edges = [connection_type.Edge(node=item, cursor=encode_cursor(item.id)) for item in items]
+    return connection_type(
+        edges=edges,
+        total_count=total_count,
+        page_info=PageInfo(
+            has_next_page=before is not None if backward else has_more,
+            has_previous_page=has_more if backward else after is not None,
+            start_cursor=edges[0].cursor if edges else None,
+            end_cursor=edges[-1].cursor if edges else None,
+        ),
+    )
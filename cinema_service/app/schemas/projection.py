@@ -0,0 +1,49 @@
+from graphql.language.ast import FragmentSpread, InlineFragment
+from graphene.utils.str_converters import to_camel_case
+
+def requested_fields(info, path=()):
+    field_asts = info.field_asts
+    for name in path:
+        field_asts = [
+            selection
+            for field_ast in field_asts
+            for selection in _collect_fields(field_ast.selection_set, info.fragments)
+            if selection.name.value == name
+        ]
+    return {
+        selection.name.value
+        for field_ast in field_asts
+        for selection in _collect_fields(field_ast.selection_set, info.fragments)
+    }
+
+def _collect_fields(selection_set, fragments):
+    if selection_set is None:
+        return []
+    fields = []
+    for selection in selection_set.selections:
+        if isinstance(selection, FragmentSpread):
+            fragment = fragments.get(selection.name.value)
+            if fragment:
+                fields.extend(_collect_fields(fragment.selection_set, fragments))
+        elif isinstance(selection, InlineFragment):
+            fields.extend(_collect_fields(selection.selection_set, fragments))
+        else:
+            fields.append(selection)
+    return fields
+
+def project(queryset, info, *extra_fields, path=()):
+    # Load only the model fields the client selected; e.g. a movie card asking for
+    # `id title posterUrl` never deserializes actors. Fields computed by a
+    # resolver list the model fields they read in the model's `derived_fields`.
+    model = queryset._document
+    model_fields = model._fields
+    lookup = {to_camel_case(name): name for name in model_fields}
+    derived = getattr(model, 'derived_fields', {})
+    requested = requested_fields(info, path)
+    fields = {lookup[name] for name in requested if name in lookup}
+    for name in requested:
+        fields.update(derived.get(name, ()))
+    fields.update(name for name in extra_fields if name in model_fields)
+    if not fields:
+        return queryset
+    return queryset.only('id', *fields)
@@ -0,0 +1,47 @@
+import random
+import threading
+import time
+
+SAMPLE_POOL_SECONDS = 60
+
+def sample(queryset, size):
+    # $sample picks the documents inside MongoDB, so the cost depends on the
+    # sample size rather than on the size of the collection.
+    model = queryset._document
+    pipeline = [{'$match': queryset._query}] if queryset._query else []
+    pipeline.append({'$sample': {'size': size}})
+    projection = queryset._loaded_fields.as_dict()
+    if projection:
+        pipeline.append({'$project': projection})
+    return [model._from_son(document) for document in model._get_collection().aggregate(pipeline)]
+
+# A pre-shuffled pool of ids per filter, handed out in rotation. Each request
+# costs a slice of an in-memory list; MongoDB only runs a $sample of
+# `size` ids when the pool has been walked through or is older than
+# SAMPLE_POOL_SECONDS.
+class SamplePool:
+    def __init__(self, size, seconds=SAMPLE_POOL_SECONDS):
+        self.size = size
+        self.seconds = seconds
+        self.lock = threading.Lock()
+        self.pools = {}
+
+    def take(self, key, queryset, count):
+        with self.lock:
+            ids, offset, filled_at = self.pools.get(key, ([], 0, 0))
+            if not ids or offset + count > len(ids) or time.monotonic() - filled_at > self.seconds:
+                ids = [document.id for document in sample(queryset.only('id'), self.size)]
+                random.shuffle(ids)
+                offset, filled_at = 0, time.monotonic()
+            self.pools[key] = (ids, offset + count, filled_at)
+            return ids[offset:offset + count]
+
+sample_pool = None
+
+def configure_sample_pool(size):
+    global sample_pool
+    sample_pool = SamplePool(size) if size else None
+    return sample_pool
+
+def get_sample_pool():
+    return sample_pool
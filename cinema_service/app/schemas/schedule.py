@@ -1,13 +1,24 @@
 from graphene_mongo import MongoengineObjectType
-from ..models.schedule import ScheduleItem,Schedule,ScheduleDay
+from ..models.seat_hold import SeatHold
+from ..models.showtime import Showtime, SCHEDULE_DAYS, CLEANUP_MINUTES
 from ..models.cinema import CinemaModel
-from ..models.seat import SeatGroupType
+from ..models.seat import SeatGroupType, SeatType, Seat, SeatMap
 from ..models.movie import MovieModel as Movie
 from ..models.cinema import CinemaModel as Cinema
 from .ticket import TicketType, TicketModel as Ticket
 from datetime import timedelta, datetime
 import graphene
 from graphene import List, InputObjectType
+from ..util.realtime import emit_seats, emit_showtime_added
+from ..util.response_cache import invalidate, tag
+from ..util.hot_documents import hot_cache
+from ..util.single_flight import coalesce
+from .projection import project, requested_fields
+
+def parse_start_time(start_time):
+    # Showtimes are stored as naive datetimes to the minute (AddScheduleItem
+    # parses %H:%M); match on that.
+    return datetime.fromisoformat(start_time).replace(tzinfo=None, second=0, microsecond=0)
 
 class SeatInputType(InputObjectType):
     seatGroup = graphene.String(required=True)
@@ -15,14 +26,19 @@ class SeatInputType(InputObjectType):
     column = graphene.Int(required=True)
 class ScheduleItemType(MongoengineObjectType):
     class Meta:
-        model = ScheduleItem
-    seats = List(SeatGroupType)       
-class ScheduleDayType(MongoengineObjectType):
-    class Meta:
-        model = ScheduleDay
-class ScheduleType(MongoengineObjectType):
-    class Meta:
-        model = Schedule
+        model = Showtime
+        exclude_fields = ('seat_maps',)
+    seats = List(SeatGroupType)
+
+    def resolve_seats(self, info):
+        expand = 'seats' in requested_fields(info)
+        return [seat_map.to_seat_group(expand) for seat_map in self.seat_maps]
+class ScheduleDayType(graphene.ObjectType):
+    day = graphene.String()
+    schedule_items = List(ScheduleItemType)
+class ScheduleType(graphene.ObjectType):
+    id = graphene.ID()
+    cinema_id = graphene.String()
     schedule_days = List(ScheduleDayType)
 
 class AddScheduleItem(graphene.Mutation):
@@ -38,30 +54,28 @@ class AddScheduleItem(graphene.Mutation):
     message = graphene.String()
 
     def mutate(self, info, schedule_day, movie_id, start_time, duration, cinema_id, price):
-        schedule = Schedule.objects(cinema_id=cinema_id).first()
-        cinema = CinemaModel.objects(id=cinema_id).first()
-        
-        if not schedule:
-            schedule = Schedule.create_cinema_schedule(cinema_id)
-            
+        cinema = hot_cache(CinemaModel).get(cinema_id)
         if not cinema:
             return AddScheduleItem(ok=False, message="Invalid cinema")
-            
-        day = next((d for d in schedule.schedule_days if d.day == schedule_day), None)
-        if not day:
+        if schedule_day not in SCHEDULE_DAYS:
             return AddScheduleItem(ok=False, message="Invalid schedule day")
-        
+
         start_time_dt = datetime.strptime(start_time, '%Y-%m-%dT%H:%M')
-        end_time_dt = start_time_dt + timedelta(minutes=duration + 30)
-        for item in day.schedule_items:
-            item_start = item.start_time
-            item_end = item.start_time + timedelta(minutes=item.duration + 30)
-            if (item_start < end_time_dt and item_end > start_time_dt):
-                return AddScheduleItem(ok=False, message="Schedule item overlaps with an existing item")
-        
-        new_item = ScheduleItem(movie_id=movie_id, cinema_id=cinema_id, start_time=start_time_dt, duration=duration, seats=cinema.seat_groups, price=price)
-        day.schedule_items.append(new_item)
-        schedule.save()
+        end_time_dt = start_time_dt + timedelta(minutes=duration + CLEANUP_MINUTES)
+        if Showtime.overlaps(cinema_id, schedule_day, start_time_dt, end_time_dt):
+            return AddScheduleItem(ok=False, message="Schedule item overlaps with an existing item")
+
+        showtime = Showtime(
+            cinema_id=cinema_id,
+            movie_id=movie_id,
+            day=schedule_day,
+            start_time=start_time_dt,
+            duration=duration,
+            price=price,
+            seat_maps=[SeatMap.from_seat_group(group) for group in cinema.seat_groups]
+        ).save()
+        invalidate(f'schedule:{cinema_id}')
+        emit_showtime_added(showtime)
 
         return AddScheduleItem(ok=True, message="Schedule item added successfully")
 class CheckSeatsAvailability(graphene.Mutation):
@@ -71,34 +85,85 @@ class CheckSeatsAvailability(graphene.Mutation):
         movie_id = graphene.String(required=True)
         start_time = graphene.String(required=True)
         seats = List(SeatInputType, required=True)
+        user_id = graphene.String()
         
     are_seats_taken = graphene.Boolean()
 
-    def mutate(self, info, cinema_id, schedule_day, movie_id, start_time, seats):
-        schedule = Schedule.objects(cinema_id=cinema_id).first()
-        if not schedule:
+    def mutate(self, info, cinema_id, schedule_day, movie_id, start_time, seats, user_id=None):
+        showtime = Showtime.find(cinema_id, schedule_day, movie_id, parse_start_time(start_time), 'seat_maps')
+        if not showtime:
             return CheckSeatsAvailability(are_seats_taken=False)
+        are_seats_taken = bool(Showtime.unavailable_seats(showtime, seats)) or bool(SeatHold.held_by_others(showtime.id, seats, user_id))
+        return CheckSeatsAvailability(are_seats_taken=are_seats_taken)
+class HoldSeats(graphene.Mutation):
+    class Arguments:
+        cinema_id = graphene.String(required=True)
+        schedule_day = graphene.String(required=True)
+        movie_id = graphene.String(required=True)
+        start_time = graphene.String(required=True)
+        seats = List(SeatInputType, required=True)
+        user_id = graphene.String(required=True)
 
-        day = next((d for d in schedule.schedule_days if d.day == schedule_day), None)
-        if not day:
-            return CheckSeatsAvailability(are_seats_taken=False)
-        dt = datetime.fromisoformat(start_time)
-        formatted_str = dt.strftime("%Y-%m-%d %H:%M:%S")
-        
-        for item in day.schedule_items:
-            if item.movie_id == movie_id and item.start_time.strftime("%Y-%m-%d %H:%M:%S") == formatted_str:
-                seat_groups = {sg.group_name: sg for sg in item.seats}
-                
-                for seat in seats:
-                    group = seat_groups.get(seat.seatGroup)
-                    if not group:
-                        continue
-                    
-                    seat_obj = next((s for s in group.seats if s.row == seat.row and s.column == seat.column), None)
-                    if seat_obj and seat_obj.is_taken:
-                        return CheckSeatsAvailability(are_seats_taken=True)
-                
-        return CheckSeatsAvailability(are_seats_taken=False)          
+    ok = graphene.Boolean()
+    message = graphene.String()
+    expires_at = graphene.DateTime()
+    conflicting_seats = List(SeatType)
+
+    def mutate(self, info, cinema_id, schedule_day, movie_id, start_time, seats, user_id):
+        if not seats:
+            return HoldSeats(ok=False, message="No seats were selected")
+        showtime = Showtime.find(cinema_id, schedule_day, movie_id, parse_start_time(start_time), 'seat_maps')
+        if not showtime:
+            return HoldSeats(ok=False, message="Invalid schedule item")
+
+        conflicts = Showtime.unavailable_seats(showtime, seats)
+        expires_at = None
+        if not conflicts:
+            expires_at, conflicts = SeatHold.hold(showtime.id, user_id, seats)
+        if conflicts:
+            return HoldSeats(
+                ok=False,
+                message="Seats are already taken or held",
+                conflicting_seats=[Seat(row=seat.row, column=seat.column, seatGroup=seat.seatGroup, is_taken=True) for seat in conflicts]
+            )
+        emit_seats('seats_held', showtime.id, seats)
+        return HoldSeats(ok=True, message="Seats are held", expires_at=expires_at)
+class ExtendSeatHold(graphene.Mutation):
+    class Arguments:
+        cinema_id = graphene.String(required=True)
+        schedule_day = graphene.String(required=True)
+        movie_id = graphene.String(required=True)
+        start_time = graphene.String(required=True)
+        user_id = graphene.String(required=True)
+
+    ok = graphene.Boolean()
+    expires_at = graphene.DateTime()
+
+    def mutate(self, info, cinema_id, schedule_day, movie_id, start_time, user_id):
+        showtime = Showtime.find(cinema_id, schedule_day, movie_id, parse_start_time(start_time), 'id')
+        expires_at = SeatHold.extend(showtime.id, user_id) if showtime else None
+        return ExtendSeatHold(ok=expires_at is not None, expires_at=expires_at)
+class ReleaseSeats(graphene.Mutation):
+    class Arguments:
+        cinema_id = graphene.String(required=True)
+        schedule_day = graphene.String(required=True)
+        movie_id = graphene.String(required=True)
+        start_time = graphene.String(required=True)
+        user_id = graphene.String(required=True)
+        seats = List(SeatInputType)
+
+    released = graphene.Int()
+
+    def mutate(self, info, cinema_id, schedule_day, movie_id, start_time, user_id, seats=None):
+        showtime = Showtime.find(cinema_id, schedule_day, movie_id, parse_start_time(start_time), 'id')
+        if not showtime:
+            return ReleaseSeats(released=0)
+        if not seats:
+            seats = SeatHold.held_seats(showtime.id, user_id)
+        released = SeatHold.release(showtime.id, user_id, seats) if seats else 0
+        if released:
+            emit_seats('seats_released', showtime.id, seats)
+        return ReleaseSeats(released=released)
 class BookSeats(graphene.Mutation):
     class Arguments:
         cinema_id = graphene.String(required=True)
@@ -112,66 +177,79 @@ class BookSeats(graphene.Mutation):
     ticket = graphene.Field(TicketType)
     success = graphene.Boolean()
     message = graphene.String()
+    conflicting_seats = List(SeatType)
     
     def mutate(self, info, cinema_id, schedule_day, movie_id, start_time, seats, user_id, duration):
-        checkSeatsAvailability = CheckSeatsAvailability.mutate(self, info, cinema_id, schedule_day, movie_id, start_time, seats)
-        if checkSeatsAvailability.are_seats_taken:
-            return BookSeats(success=False, message="Seats were taken in meanwhile", ticket=None)
-        
-        schedule = Schedule.objects(cinema_id=cinema_id).first()
-        
-        if not schedule:
-            return BookSeats(success=False, message="There is no schedule for current cinema", ticket=None)
-        
-        day = next((d for d in schedule.schedule_days if d.day == schedule_day), None)
-        if not day:
-            
-            return BookSeats(success=False, message="The day is invalid", ticket=None)
-        dt = datetime.fromisoformat(start_time)
-        formatted_str = dt.strftime("%Y-%m-%d %H:%M:%S")
-        
-        for item in day.schedule_items:
-            if item.movie_id == movie_id and item.start_time.strftime("%Y-%m-%d %H:%M:%S") == formatted_str:
-                seat_groups = {sg.group_name: sg for sg in item.seats}
-                for seat in seats:
-                    group = seat_groups.get(seat.seatGroup)
-                    if not group:
-                        continue
-                    
-                    seat_obj = next((s for s in group.seats if s.row == seat.row and s.column == seat.column), None)
-                    if seat_obj and not seat_obj.is_taken:
-                        seat_obj.is_taken = True
-        schedule.save()  
+        if not seats:
+            return BookSeats(success=False, message="No seats were selected", ticket=None)
+
+        start_time_dt = parse_start_time(start_time)
+        showtime = Showtime.find(cinema_id, schedule_day, movie_id, start_time_dt, 'id', 'seat_maps.group_name', 'seat_maps.rows', 'seat_maps.row_words')
+        if not showtime:
+            return BookSeats(success=False, message="Invalid schedule item", ticket=None)
+
+        conflicts = SeatHold.held_by_others(showtime.id, seats, user_id)
+        if not conflicts:
+            conflicts = Showtime.book_seats(showtime, seats)
+        if conflicts:
+            return BookSeats(
+                success=False,
+                message="Seats were taken in meanwhile",
+                ticket=None,
+                conflicting_seats=[Seat(row=seat.row, column=seat.column, seatGroup=seat.seatGroup, is_taken=True) for seat in conflicts]
+            )
+
         newTicket = Ticket(
             user = user_id,
-            movie = Movie.objects(id=movie_id).first(),
-            cinema = Cinema.objects(id=cinema_id).first(),
+            movie = hot_cache(Movie).get(movie_id),
+            cinema = hot_cache(Cinema).get(cinema_id),
             duration = duration,
             start_time = start_time,
-            seats = seats,
+            seats = [Seat(row=seat.row, column=seat.column, seatGroup=seat.seatGroup, is_taken=True) for seat in seats],
             reserved_at = datetime.now()
         )    
         newTicket.save()
+        SeatHold.release(showtime.id, user_id, seats)
+        invalidate(f'showtime:{showtime.id}')
+        emit_seats('seats_taken', showtime.id, seats)
         ticket=newTicket
         return BookSeats(success=True, message="Seats are booked successfully", ticket=ticket)
 
 class Mutation(graphene.ObjectType):
     add_schedule_item = AddScheduleItem.Field()
     check_seats_availability = CheckSeatsAvailability.Field() 
+    hold_seats = HoldSeats.Field()
+    extend_seat_hold = ExtendSeatHold.Field()
+    release_seats = ReleaseSeats.Field()
     book_seats = BookSeats.Field()  
 class Query(graphene.ObjectType):
     schedules = graphene.List(ScheduleType, cinema_id=graphene.String(required=True))
     schedule_item = graphene.Field(ScheduleItemType, cinema_id=graphene.String(required=True), movie_id=graphene.String(required=True), day=graphene.String(required=True), start_time=graphene.String(required=True))
     
     def resolve_schedules(self, info, cinema_id):
-        return Schedule.objects(cinema_id=cinema_id)
+        if not hot_cache(CinemaModel).get(cinema_id):
+            return []
+        path = ('scheduleDays', 'scheduleItems')
+        fields = requested_fields(info, path)
+        seat_maps = ('seat_maps',) if 'seats' in fields else ()
+        if seat_maps:
+            tag(*(f'showtime:{showtime_id}' for showtime_id in Showtime.objects(cinema_id=cinema_id).distinct('id')))
+        showtimes = coalesce('schedules', (cinema_id, frozenset(fields)), lambda: list(
+            project(Showtime.objects(cinema_id=cinema_id).order_by('start_time'), info, 'day', *seat_maps, path=path)
+        ))
+        days = {day: [] for day in SCHEDULE_DAYS}
+        for showtime in showtimes:
+            days[showtime.day].append(showtime)
+        return [ScheduleType(
+            id=cinema_id,
+            cinema_id=cinema_id,
+            schedule_days=[ScheduleDayType(day=day, schedule_items=items) for day, items in days.items()]
+        )]
     def resolve_schedule_item(self, info, cinema_id, movie_id, day, start_time):
-        schedules = Schedule.objects(cinema_id=cinema_id)
-        for schedule in schedules:
-            for schedule_day in schedule.schedule_days:
-                if schedule_day.day == day:
-                    for schedule_item in schedule_day.schedule_items:
-                        if (schedule_item.movie_id == movie_id and
-                                schedule_item.start_time.isoformat() == start_time):
-                            return schedule_item
-        return None
\ No newline at end of file
+        # The id comes first so the showtime's tag is recorded before its seat
+        # maps are read.
+        found = Showtime.find(cinema_id, day, movie_id, parse_start_time(start_time), 'id')
+        if not found:
+            return None
+        tag(f'showtime:{found.id}')
+        return coalesce('scheduleItem', found.id, lambda: Showtime.objects(id=found.id).first())
@@ -2,10 +2,22 @@ import graphene
 from graphene_mongo import MongoengineObjectType
 from app.models.ticket import TicketModel
 from graphene import String
+from .movie import MovieType
+from .cinema import CinemaType
+from .loaders import get_loaders, reference_id
+from .projection import project
 
 class TicketType(MongoengineObjectType):
     class Meta:
         model = TicketModel
+    movie = graphene.Field(MovieType)
+    cinema = graphene.Field(CinemaType)
+
+    def resolve_movie(self, info):
+        return get_loaders(info).movies.load(reference_id(self, 'movie'))
+
+    def resolve_cinema(self, info):
+        return get_loaders(info).cinemas.load(reference_id(self, 'cinema'))
         
 class Query(graphene.ObjectType):
     all_tickets = graphene.List(TicketType)
@@ -13,11 +25,11 @@ class Query(graphene.ObjectType):
     fetch_ticket = graphene.Field(TicketType, id=String(required=True))
 
     def resolve_all_tickets(self, info):
-        return list(TicketModel.objects)
+        return list(project(TicketModel.objects, info))
     def resolve_tickets_by_user(self, info, userId):
-        return list(TicketModel.objects(user=userId))
+        return list(project(TicketModel.objects(user=userId), info))
     def resolve_fetch_ticket(self, info, id):
-        ticket = TicketModel.objects(id=id).first()
+        ticket = project(TicketModel.objects(id=id), info).first()
         if not ticket:
             raise Exception("Ticket not found")
-        return ticket
\ No newline at end of file
+        return ticket
@@ -8,10 +8,21 @@ import jwt
 from dotenv import load_dotenv
 import os
 from app.util.reset_password import send_password_reset_email
+from .projection import project
+from .pagination import paginate, facet_page, CountedConnection
+from app.util.search import search
+from app.util.response_cache import invalidate
 
 class UserType(MongoengineObjectType):
     class Meta:
         model = UserModel
+        exclude_fields = ('search_keywords',)
+class UserConnection(CountedConnection):
+    class Meta:
+        node = UserType
+class UserPage(graphene.ObjectType):
+    items = graphene.List(UserType)
+    total_count = graphene.Int()
 class CreateUser(graphene.Mutation):
     class Arguments:
         username = String(required=True)
@@ -39,6 +50,7 @@ class CreateUser(graphene.Mutation):
         )
         user.set_password(password)
         user.save()
+        invalidate('users')
         return CreateUser(user=user)
 class DeleteUser(graphene.Mutation):
     class Arguments:
@@ -50,6 +62,7 @@ class DeleteUser(graphene.Mutation):
         try:
             user = UserModel.objects.get(id=user_id)
             user.delete()
+            invalidate('users')
             success = True
         except UserModel.DoesNotExist:
             success = False
@@ -84,6 +97,7 @@ class EditUser(graphene.Mutation):
                 user.email = new_email
             
             user.save()
+            invalidate('users')
             success = True
         except UserModel.DoesNotExist:
             print('asd')
@@ -154,24 +168,38 @@ class Query(graphene.ObjectType):
     search_users = graphene.List(UserType, query=String(required=True), limit=Int(), skip=Int())
     users_count = graphene.Int()
     search_users_count = graphene.Int(query=String(required=True))
+    users_page = graphene.Field(UserPage, query=String(), limit=Int(), skip=Int())
+    all_users_connection = graphene.Field(UserConnection, first=Int(), after=String(), last=Int(), before=String())
+    search_users_connection = graphene.Field(UserConnection, query=String(required=True), first=Int(), after=String(), last=Int(), before=String())
 
     def resolve_all_users(self, info, limit=None, skip=None):
-        query = UserModel.objects
+        query = project(UserModel.objects, info)
         if skip:
             query = query.skip(skip)
         if limit:
             query = query.limit(limit)
         return list(query)
     
+    def resolve_users_page(self, info, query=None, limit=None, skip=None):
+        query_set = UserModel.objects
+        if query:
+            query_set = search(query_set, query)
+        return facet_page(query_set, info, UserPage, skip, limit)
+
+    def resolve_all_users_connection(self, info, first=None, after=None, last=None, before=None):
+        return paginate(UserModel.objects, info, UserConnection, first, after, last, before)
+
+    def resolve_search_users_connection(self, info, query, first=None, after=None, last=None, before=None):
+        query_set = search(UserModel.objects, query)
+        return paginate(query_set, info, UserConnection, first, after, last, before)
+    
     def resolve_fetch_user(self, info, user_id):
-        user = UserModel.objects(id=user_id).first()
+        user = project(UserModel.objects(id=user_id), info).first()
         if not user:
             raise Exception(f"User with id {user_id} not found")
         return user
     def resolve_search_users(self, info, query, limit=None, skip=None):
-        query_set =  UserModel.objects.filter(
-            Q(username__icontains=query) | Q(email__icontains=query)
-        )
+        query_set =  project(search(UserModel.objects, query), info)
         if skip:
             query_set = query_set.skip(skip)
         if limit:
@@ -182,9 +210,7 @@ class Query(graphene.ObjectType):
         return UserModel.objects.count()
     
     def resolve_search_users_count(self, info, query):
-        query_set = UserModel.objects.filter(
-            Q(username__icontains=query) | Q(email__icontains=query)
-        )
+        query_set = search(UserModel.objects, query)
         return query_set.count()
 class Mutation(graphene.ObjectType):
     create_user = CreateUser.Field()
@@ -0,0 +1,186 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+import bson
+from pymongo.errors import OperationFailure, PyMongoError
+from .single_flight import coalesce
+
+logger = logging.getLogger(__name__)
+
+HOT_DOCUMENT_CACHE_SIZE = 512
+STREAM_TTL_SECONDS = 600
+FALLBACK_TTL_SECONDS = 30
+RETRY_SECONDS = 5
+CHANGE_STREAMS_UNSUPPORTED = (40573, 40415)
+
+# Per-process cache for slowly changing documents (movies and cinemas) that
+# are read on almost every request path. Documents are kept BSON-encoded, so
+# each caller gets a fresh instance it may mutate and save. A background
+# change stream drops entries as soon as any process writes them; when the
+# deployment has no change streams (a standalone mongod), entries simply
+# expire after a short TTL instead.
+class HotDocumentCache:
+    def __init__(self, model, max_size=HOT_DOCUMENT_CACHE_SIZE):
+        self.model = model
+        self.max_size = max_size
+        self.ttl = FALLBACK_TTL_SECONDS
+        self.mode = 'ttl'
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.generation = 0
+        self.counters = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+
+    def get(self, document_id):
+        document_id = document_key(document_id)
+        return self.get_many([document_id]).get(document_id)
+
+    def get_many(self, document_ids):
+        found = {}
+        missing = []
+        now = time.monotonic()
+        with self.lock:
+            generation = self.generation
+            for document_id in document_ids:
+                entry = self.entries.get(document_id)
+                if entry is None or entry[1] < now:
+                    missing.append(document_id)
+                    continue
+                self.entries.move_to_end(document_id)
+                found[document_id] = entry[0]
+            self.counters['hits'] += len(found)
+            self.counters['misses'] += len(missing)
+
+        if missing:
+            key = tuple(sorted(missing, key=str))
+            found.update(coalesce(self.model._get_collection_name(), key, lambda: self.fetch(missing, generation)))
+        return {document_id: self.model._from_son(bson.decode(encoded)) for document_id, encoded in found.items()}
+
+    def fetch(self, document_ids, generation):
+        fetched = {}
+        for son in self.model._get_collection().find({'_id': {'$in': document_ids}}):
+            fetched[son['_id']] = encoded = bson.encode(son)
+            self.put(son['_id'], encoded, generation)
+        return fetched
+
+    def put(self, document_id, encoded, generation):
+        # Skip caching a copy that was invalidated while it was being read.
+        with self.lock:
+            if generation != self.generation:
+                return
+            self.entries[document_id] = (encoded, time.monotonic() + self.ttl)
+            self.entries.move_to_end(document_id)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+                self.counters['evictions'] += 1
+
+    def invalidate(self, document_id):
+        with self.lock:
+            self.generation += 1
+            if self.entries.pop(document_id, None) is not None:
+                self.counters['invalidations'] += 1
+
+    def clear(self):
+        with self.lock:
+            self.generation += 1
+            self.counters['invalidations'] += len(self.entries)
+            self.entries.clear()
+
+    def set_mode(self, mode):
+        with self.lock:
+            self.mode = mode
+            self.ttl = STREAM_TTL_SECONDS if mode == 'change_stream' else FALLBACK_TTL_SECONDS
+            self.generation += 1
+            self.entries.clear()
+
+    def stats(self):
+        with self.lock:
+            stats = dict(self.counters, size=len(self.entries), max_size=self.max_size, mode=self.mode, ttl=self.ttl)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 3) if lookups else 0.0
+        return stats
+
+    def watch(self):
+        resume_after = None
+        while True:
+            try:
+                with self.model._get_collection().watch(resume_after=resume_after) as stream:
+                    self.set_mode('change_stream')
+                    for change in stream:
+                        resume_after = stream.resume_token
+                        if 'documentKey' in change:
+                            self.invalidate(change['documentKey']['_id'])
+                        else:
+                            resume_after = None
+                            self.clear()
+            except OperationFailure as e:
+                if e.code in CHANGE_STREAMS_UNSUPPORTED:
+                    logger.warning("Change streams unavailable for %s, falling back to a %ds TTL", self.model.__name__, FALLBACK_TTL_SECONDS)
+                    self.set_mode('ttl')
+                    return
+                logger.warning("Change stream for %s failed: %s", self.model.__name__, e)
+                resume_after = None
+            except PyMongoError as e:
+                logger.warning("Change stream for %s interrupted: %s", self.model.__name__, e)
+            self.set_mode('ttl')
+            time.sleep(RETRY_SECONDS)
+
+def document_key(document_id):
+    return bson.ObjectId(document_id) if bson.ObjectId.is_valid(str(document_id)) else document_id
+
+def hot_models():
+    from ..models.movie import MovieModel
+    from ..models.cinema import CinemaModel
+    return {'movie': MovieModel, 'cinema': CinemaModel}
+
+hot_caches = {}
+
+def hot_cache(model):
+    cache = hot_caches.get(model)
+    if cache is None:
+        cache = hot_caches.setdefault(model, HotDocumentCache(model))
+    return cache
+
+def forget_tags(tags):
+    # Drops documents named by response cache tags such as `movie:<id>`, so a
+    # process sees its own writes at once, even without change streams.
+    models = hot_models()
+    for tag in tags:
+        kind, _, document_id = tag.partition(':')
+        if kind in models and document_id:
+            hot_cache(models[kind]).invalidate(document_key(document_id))
+
+def start_watchers():
+    for model in hot_models().values():
+        threading.Thread(target=hot_cache(model).watch, name=f'watch-{model._get_collection_name()}', daemon=True).start()
+
+def hot_cache_stats():
+    return {model._get_collection_name(): cache.stats() for model, cache in hot_caches.items()}
+
+if __name__ == '__main__':
+    # Smoke test against MONGO_URI, e.g. a local single-node replica set:
+    #   docker run -d -p 27017:27017 mongo:7 --replSet rs0
+    #   docker exec <container> mongosh --eval 'rs.initiate()'
+    #   MONGO_URI=mongodb://localhost:27017/?directConnection=true python -m app.util.hot_documents
+    import os
+    from dotenv import load_dotenv
+    from mongoengine import connect
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO)
+    connect(db='cinemacollection', host=os.environ.get('MONGO_URI'), alias='default')
+    from ..models.movie import MovieModel
+    start_watchers()
+    cache = hot_cache(MovieModel)
+    time.sleep(1)
+    collection = MovieModel._get_collection()
+    document_id = collection.insert_one({'title': 'hot-document-check', 'genres': [], 'duration': 1}).inserted_id
+    try:
+        cache.get(document_id)
+        collection.update_one({'_id': document_id}, {'$set': {'duration': 2}})
+        deadline = time.monotonic() + 5
+        while document_id in cache.entries and time.monotonic() < deadline:
+            time.sleep(0.1)
+        invalidated = document_id not in cache.entries
+        print(f"mode={cache.mode} invalidated_by_change_stream={invalidated}")
+    finally:
+        collection.delete_one({'_id': document_id})
@@ -0,0 +1,139 @@
+import logging
+import sys
+import threading
+import time
+from pymongo.errors import OperationFailure, PyMongoError
+
+HEALTH_CHECK_SECONDS = 30
+SPEC_OPTIONS = ('unique', 'sparse', 'expireAfterSeconds', 'default_language', 'partialFilterExpression')
+
+logger = logging.getLogger(__name__)
+_health = (None, 0)
+
+# Every model declares the indexes its queries need in `meta['indexes']`; the
+# names below are what MongoDB calls them when created without an explicit
+# name, so the declared and the existing indexes can be compared directly.
+# The legacy Schedule collection is not listed: util/migrate_showtimes.py
+# drops it once its items have moved to Showtime.
+def indexed_models():
+    from ..models.movie import MovieModel
+    from ..models.cinema import CinemaModel
+    from ..models.actor import ActorModel
+    from ..models.user import UserModel
+    from ..models.admin import AdminUser
+    from ..models.ticket import TicketModel
+    from ..models.showtime import Showtime
+    from ..models.seat_hold import SeatHold
+    from ..models.rating import Rating
+    from ..models.comment import CommentModel
+    from ..models.persisted_query import PersistedQuery
+    return [MovieModel, CinemaModel, ActorModel, UserModel, AdminUser, TicketModel, Showtime, SeatHold, Rating, CommentModel, PersistedQuery]
+
+def index_name(fields):
+    return '_'.join(f'{field}_{direction}' for field, direction in fields)
+
+def raw_collection(model):
+    # Document._get_collection() would build the declared indexes itself as a
+    # side effect; going through the database shows what is really there.
+    return model._get_db()[model._get_collection_name()]
+
+def declared_indexes(model):
+    return {index_name(spec['fields']): spec for spec in model._meta.get('index_specs') or []}
+
+def ensure_indexes(models=None):
+    # Builds missing indexes without blocking reads and writes on the
+    # collection; existing ones are left alone, so this is safe to re-run.
+    created = []
+    for model in models or indexed_models():
+        collection = raw_collection(model)
+        existing = collection.index_information()
+        for name, spec in declared_indexes(model).items():
+            if name in existing:
+                continue
+            options = {option: spec[option] for option in SPEC_OPTIONS if option in spec}
+            collection.create_index(spec['fields'], background=True, **options)
+            created.append(f'{collection.name}.{name}')
+    return created
+
+def build_indexes():
+    global _health
+    try:
+        for name in ensure_indexes():
+            logger.warning("Created index %s", name)
+    except PyMongoError as e:
+        logger.error("Could not create indexes: %s", e)
+    _health = (None, 0)
+
+def start_index_build():
+    # Run at startup so a fresh database becomes healthy without a manual
+    # --ensure; in a thread, since building on a large collection takes time.
+    threading.Thread(target=build_indexes, name='ensure-indexes', daemon=True).start()
+
+def index_usage(collection):
+    # Number of operations per index since the server started, or None when
+    # $indexStats is unavailable (e.g. missing privileges).
+    try:
+        return {stats['name']: stats['accesses']['ops'] for stats in collection.aggregate([{'$indexStats': {}}])}
+    except (OperationFailure, NotImplementedError):
+        return None
+
+def index_report(models=None):
+    report = {}
+    for model in models or indexed_models():
+        collection = raw_collection(model)
+        declared = declared_indexes(model)
+        existing = collection.index_information()
+        usage = index_usage(collection)
+        report[collection.name] = {
+            'missing': sorted(name for name in declared if name not in existing),
+            'undeclared': sorted(name for name in existing if name != '_id_' and name not in declared),
+            'unused': sorted(
+                name for name, ops in (usage or {}).items()
+                if ops == 0 and name != '_id_' and not existing.get(name, {}).get('unique')
+            ) if usage is not None else None,
+        }
+    return report
+
+def missing_indexes(models=None):
+    missing = {}
+    for model in models or indexed_models():
+        collection = raw_collection(model)
+        existing = collection.index_information()
+        names = [name for name in declared_indexes(model) if name not in existing]
+        if names:
+            missing[collection.name] = names
+    return missing
+
+def index_health():
+    # Cached for HEALTH_CHECK_SECONDS, so frequent probes do not each list the
+    # indexes of every collection.
+    global _health
+    result, checked_at = _health
+    if result is None or time.monotonic() - checked_at > HEALTH_CHECK_SECONDS:
+        try:
+            missing = missing_indexes()
+            result = {'status': 'ok' if not missing else 'missing_indexes', 'missing_indexes': missing}
+        except PyMongoError as e:
+            result = {'status': 'unavailable', 'error': str(e)}
+        _health = (result, time.monotonic())
+    return result
+
+if __name__ == '__main__':
+    # python -m app.util.indexes            report missing, undeclared and unused indexes
+    # python -m app.util.indexes --ensure   create the missing ones first
+    # python -m app.util.indexes --check    exit with 1 while a declared index is missing
+    import os
+    from dotenv import load_dotenv
+    from mongoengine import connect
+    load_dotenv()
+    connect(db='cinemacollection', host=os.environ.get('MONGO_URI'), alias='default')
+    if '--ensure' in sys.argv:
+        for name in ensure_indexes():
+            print(f"Created {name}")
+    report = index_report()
+    for collection, entry in report.items():
+        for kind in ('missing', 'undeclared', 'unused'):
+            for name in entry[kind] or []:
+                print(f"{collection}: {kind} index {name}")
+    if '--check' in sys.argv and any(entry['missing'] for entry in report.values()):
+        sys.exit(1)
@@ -0,0 +1,33 @@
+from pymongo import UpdateOne
+from ..models.movie import MovieModel
+from ..models.comment import CommentModel
+
+def migrate_comments():
+    # Moves the comments embedded in each movie into the comments collection
+    # and drops the embedded list. Upserts on (movie_id, timestamp, username),
+    # so a run interrupted half way can simply be repeated.
+    collection = MovieModel._get_collection()
+    migrated = 0
+    for movie in collection.find({'comments': {'$exists': True}}, {'comments': 1}):
+        requests = [
+            UpdateOne(
+                {'movie_id': movie['_id'], 'timestamp': comment['timestamp'], 'username': comment['username']},
+                {'$setOnInsert': {'content': comment['content']}},
+                upsert=True
+            )
+            for comment in sorted(movie.get('comments') or [], key=lambda comment: comment['timestamp'])
+        ]
+        if requests:
+            CommentModel._get_collection().bulk_write(requests, ordered=True)
+        collection.update_one({'_id': movie['_id']}, {'$unset': {'comments': ''}})
+        migrated += len(requests)
+    return migrated
+
+if __name__ == '__main__':
+    import os
+    from dotenv import load_dotenv
+    from mongoengine import connect
+    load_dotenv()
+    connect(db='cinemacollection', host=os.environ.get('MONGO_URI'), alias='default')
+    CommentModel.ensure_indexes()
+    print(f"Migrated {migrate_comments()} comments")
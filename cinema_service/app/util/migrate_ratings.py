@@ -0,0 +1,47 @@
+import sys
+from datetime import datetime
+from pymongo import UpdateOne
+from ..models.movie import MovieModel
+from ..models.cinema import CinemaModel
+from ..models.rating import Rating
+
+def migrate_ratings(target_type, model):
+    # Moves the legacy `rating` average and `ratedBy` list of every document
+    # into rating documents plus the rating_sum/rating_count counters. The
+    # individual values were never stored, so each rater is recorded with the
+    # old average. Only documents still carrying `ratedBy` are touched, so it
+    # is safe to re-run. The counters are incremented rather than set, so
+    # ratings given since the deploy, which are not in `ratedBy`, are kept.
+    collection = model._get_collection()
+    migrated = 0
+    for document in collection.find({'ratedBy': {'$exists': True}}, {'rating': 1, 'ratedBy': 1}):
+        raters = list(dict.fromkeys(document.get('ratedBy') or []))
+        average = float(document.get('rating') or 0.0)
+        requests = [
+            UpdateOne(
+                {'target_type': target_type, 'target_id': document['_id'], 'user_id': user_id},
+                {'$setOnInsert': {'value': average, 'created_at': datetime.utcnow()}},
+                upsert=True
+            )
+            for user_id in raters
+        ]
+        if requests:
+            Rating._get_collection().bulk_write(requests, ordered=False)
+        collection.update_one(
+            {'_id': document['_id']},
+            {
+                '$inc': {'rating_sum': average * len(raters), 'rating_count': len(raters)},
+                '$unset': {'rating': '', 'ratedBy': ''}
+            }
+        )
+        migrated += 1
+    return migrated
+
+if __name__ == '__main__':
+    import os
+    from dotenv import load_dotenv
+    from mongoengine import connect
+    load_dotenv()
+    connect(db='cinemacollection', host=os.environ.get('MONGO_URI'), alias='default')
+    Rating.ensure_indexes()
+    print(f"Migrated ratings of {migrate_ratings('movie', MovieModel)} movies and {migrate_ratings('cinema', CinemaModel)} cinemas")
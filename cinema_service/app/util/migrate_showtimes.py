@@ -0,0 +1,44 @@
+import sys
+from pymongo import UpdateOne
+from ..models.schedule import Schedule
+from ..models.showtime import Showtime
+from ..models.seat import SeatMap
+
+def migrate_showtimes(drop=False):
+    # Copies every item of the legacy per-cinema schedule documents into its own
+    # showtime document. Upserts on (cinema_id, movie_id, start_time), so it is
+    # safe to re-run while the old layout is still being written to.
+    requests = []
+    for schedule in Schedule.objects:
+        for schedule_day in schedule.schedule_days:
+            for item in schedule_day.schedule_items:
+                showtime = Showtime(
+                    cinema_id=item.cinema_id or schedule.cinema_id,
+                    movie_id=item.movie_id,
+                    day=schedule_day.day,
+                    start_time=item.start_time,
+                    duration=item.duration,
+                    price=item.price,
+                    seat_maps=[SeatMap.from_seat_group(group) for group in item.seats]
+                )
+                showtime.clean()
+                document = showtime.to_mongo().to_dict()
+                requests.append(UpdateOne(
+                    {'cinema_id': showtime.cinema_id, 'movie_id': showtime.movie_id, 'start_time': showtime.start_time},
+                    {'$setOnInsert': document},
+                    upsert=True
+                ))
+    if requests:
+        Showtime.ensure_indexes()
+        Showtime._get_collection().bulk_write(requests, ordered=False)
+    if drop:
+        Schedule.drop_collection()
+    return len(requests)
+
+if __name__ == '__main__':
+    import os
+    from dotenv import load_dotenv
+    from mongoengine import connect
+    load_dotenv()
+    connect(db='cinemacollection', host=os.environ.get('MONGO_URI'), alias='default')
+    print(f"Migrated {migrate_showtimes(drop='--drop' in sys.argv)} showtimes")
@@ -0,0 +1,264 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from flask import Response, g, request
+from flask_graphql import GraphQLView
+from graphql.error import GraphQLError
+from graphql.language.ast import FragmentDefinition, FragmentSpread, InlineFragment
+from graphql_server import HttpQueryError, get_graphql_params
+from ..models.persisted_query import PersistedQuery
+from ..schemas.cost import analyze, find_operation
+from ..schemas.documents import DOCUMENT_CACHE_SIZE
+from .query_budget import QueryBudgetExceeded
+from .response_cache import cache_key, cache_tags, get_response_cache
+from .single_flight import coalesce
+
+logger = logging.getLogger(__name__)
+
+# Root query fields that only read public catalogue data, with how long (in
+# seconds) a GET response made up of them may be cached by nginx and browsers.
+PUBLIC_QUERY_MAX_AGE = {
+    'allMoviesPage': 300,
+    'searchMoviesPage': 300,
+    'moviesPage': 300,
+    'allMoviesConnection': 300,
+    'searchMoviesConnection': 300,
+    'movieCount': 300,
+    'searchMovieCount': 300,
+    'fetchMovie': 300,
+    'randomMovies': 60,
+    'allCinemas': 300,
+    'searchCinemas': 300,
+    'cinemasPage': 300,
+    'allCinemasConnection': 300,
+    'searchCinemasConnection': 300,
+    'cinemaCount': 300,
+    'searchCinemaCount': 300,
+    'fetchCinema': 300,
+    'allActors': 300,
+    'actorsPage': 300,
+    'allActorsConnection': 300,
+    'actorsCount': 300,
+    'searchActorsCount': 300,
+    'fetchActor': 300,
+    'moviesByActor': 300,
+    'searchMoviesByActor': 300,
+    'movieActorCount': 300,
+    'searchMovieActorCount': 300,
+    'schedules': 60,
+}
+# Fields that depend on who is asking or change with every rating and comment;
+# a response selecting any of them, at any depth, is never cached publicly.
+PRIVATE_FIELDS = {'ratedBy', 'comments', 'rating'}
+MAX_QUERY_LENGTH = 20000
+
+class PersistedQueryNotFound(Exception):
+    pass
+
+_queries = OrderedDict()
+_lock = threading.Lock()
+
+def query_hash(query):
+    return hashlib.sha256(query.encode()).hexdigest()
+
+def remember(sha256_hash, query):
+    with _lock:
+        _queries[sha256_hash] = query
+        _queries.move_to_end(sha256_hash)
+        if len(_queries) > DOCUMENT_CACHE_SIZE:
+            _queries.popitem(last=False)
+
+def lookup(sha256_hash):
+    with _lock:
+        query = _queries.get(sha256_hash)
+    if query is None:
+        query = PersistedQuery.lookup(sha256_hash)
+        if query is not None:
+            remember(sha256_hash, query)
+    return query
+
+def store(sha256_hash, query):
+    if query_hash(query) != sha256_hash:
+        raise HttpQueryError(400, 'provided sha does not match query')
+    if len(query) > MAX_QUERY_LENGTH:
+        raise HttpQueryError(400, 'Query is too long to persist.')
+    with _lock:
+        known = _queries.get(sha256_hash) is not None
+    if not known:
+        PersistedQuery.store(sha256_hash, query)
+        remember(sha256_hash, query)
+
+def load_json_param(value):
+    if not isinstance(value, str):
+        return value
+    try:
+        return json.loads(value)
+    except ValueError:
+        raise HttpQueryError(400, 'Extensions are invalid JSON.')
+
+def selected_fields(selection_set, fragments, seen=None):
+    # Every field name in the selection set, following fragments.
+    seen = set() if seen is None else seen
+    for selection in selection_set.selections if selection_set else []:
+        if isinstance(selection, FragmentSpread):
+            name = selection.name.value
+            if name not in seen and name in fragments:
+                seen.add(name)
+                yield from selected_fields(fragments[name].selection_set, fragments, seen)
+        elif isinstance(selection, InlineFragment):
+            yield from selected_fields(selection.selection_set, fragments, seen)
+        else:
+            yield selection.name.value
+            yield from selected_fields(selection.selection_set, fragments, seen)
+
+def public_max_age(document_ast, operation_name):
+    operation = find_operation(document_ast, operation_name)
+    if operation is None or operation.operation != 'query':
+        return None
+    names = [getattr(selection, 'name', None) for selection in operation.selection_set.selections]
+    if not names or any(name is None or name.value not in PUBLIC_QUERY_MAX_AGE for name in names):
+        return None
+    fragments = {
+        definition.name.value: definition
+        for definition in document_ast.definitions if isinstance(definition, FragmentDefinition)
+    }
+    if any(name in PRIVATE_FIELDS for name in selected_fields(operation.selection_set, fragments)):
+        return None
+    return min(PUBLIC_QUERY_MAX_AGE[name.value] for name in names)
+
+# GraphQL endpoint speaking Apollo's automatic persisted query protocol: a
+# client sends only the sha256 of a query, over GET so the URL is a cache key,
+# and falls back to sending the full text once when the hash is unknown.
+# Successful GETs that only read public data get Cache-Control and an ETag.
+# Every operation is costed before it runs and charged against the budget, and
+# cacheable queries are answered from the response cache when possible.
+class PersistedQueryView(GraphQLView):
+    init_every_request = False
+    budget = None
+
+    def parse_body(self):
+        if 'graphql_data' not in g:
+            g.graphql_data = self.resolve_body()
+        return g.graphql_data
+
+    def resolve_body(self):
+        data = super().parse_body()
+        if not isinstance(data, dict):
+            return data
+        extensions = load_json_param(data.get('extensions') or request.args.get('extensions')) or {}
+        persisted = extensions.get('persistedQuery') if isinstance(extensions, dict) else None
+        if not persisted:
+            return data
+
+        sha256_hash = persisted.get('sha256Hash')
+        if persisted.get('version') != 1 or not isinstance(sha256_hash, str):
+            raise HttpQueryError(400, 'Unsupported persisted query version.')
+        data = dict(data)
+        query = data.get('query') or request.args.get('query')
+        if query:
+            store(sha256_hash, query)
+        else:
+            query = lookup(sha256_hash)
+            if query is None:
+                raise PersistedQueryNotFound()
+        data['query'] = query
+        return data
+
+    def dispatch_request(self):
+        try:
+            params, document = self.prepare()
+            cost, depth = self.charge_budget(params, document)
+            started = time.perf_counter()
+            response = self.execute_cached(params, document)
+        except PersistedQueryNotFound:
+            return Response(
+                self.encode({'errors': [{'message': 'PersistedQueryNotFound', 'extensions': {'code': 'PERSISTED_QUERY_NOT_FOUND'}}]}),
+                status=200,
+                content_type='application/json'
+            )
+        except QueryBudgetExceeded as e:
+            response = Response(
+                self.encode({'errors': [{'message': str(e), 'extensions': {'code': 'QUERY_BUDGET_EXCEEDED'}}]}),
+                status=e.status_code,
+                content_type='application/json'
+            )
+            if e.retry_after:
+                response.headers['Retry-After'] = str(e.retry_after)
+            return response
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        operation_name = params.operation_name if params else None
+        logger.info("GraphQL operation %s cost %d (depth %d) ran in %.1f ms", operation_name or '<anonymous>', cost, depth, elapsed_ms)
+        response.headers['X-Query-Cost'] = str(cost)
+        if request.method == 'GET' and response.status_code == 200:
+            self.set_cache_headers(response)
+        return response
+
+    def prepare(self):
+        # Malformed requests are left for GraphQLView to reject with its own errors.
+        try:
+            data = self.parse_body()
+            if not isinstance(data, dict):
+                return None, None
+            params = get_graphql_params(data, request.args)
+            if not params.query:
+                return params, None
+            return params, self.get_backend().document_from_string(self.schema, params.query)
+        except (HttpQueryError, GraphQLError):
+            return None, None
+
+    def charge_budget(self, params, document):
+        if document is None:
+            return 0, 0
+        cost, depth = analyze(self.schema, document.document_ast, params.operation_name, params.variables)
+        if self.budget:
+            self.budget.charge(request.headers.get('X-Real-IP') or request.remote_addr, cost, depth)
+        return cost, depth
+
+    def execute_cached(self, params, document):
+        operation = find_operation(document.document_ast, params.operation_name) if document else None
+        tags = cache_tags(operation, params.variables or {}) if operation and operation.operation == 'query' else None
+        if not tags:
+            return super().dispatch_request()
+
+        cache = get_response_cache()
+        key = cache_key(document.document_ast, params.operation_name, params.variables)
+        body = cache.get(key)
+        if body is not None:
+            response = Response(body, status=200, content_type='application/json')
+            response.headers['X-Cache'] = 'HIT'
+            return response
+
+        # Identical queries arriving while this one runs wait for its result
+        # instead of each executing against Mongo.
+        body, status_code = coalesce('graphql', key, lambda: self.execute_and_store(key, tags))
+        response = Response(body, status=status_code, content_type='application/json')
+        response.headers['X-Cache'] = 'MISS'
+        return response
+
+    def execute_and_store(self, key, tags):
+        cache = get_response_cache()
+        versions = cache.versions(tags)
+        g.cache_tags = {}
+        response = GraphQLView.dispatch_request(self)
+        body = response.get_data(as_text=True)
+        if response.status_code == 200 and 'errors' not in json.loads(body):
+            versions.update(g.cache_tags)
+            cache.set(key, body, versions)
+        return body, response.status_code
+
+    def set_cache_headers(self, response):
+        max_age = None
+        query = self.parse_body().get('query') or request.args.get('query')
+        if query and 'errors' not in json.loads(response.get_data()):
+            document = self.get_backend().document_from_string(self.schema, query)
+            max_age = public_max_age(document.document_ast, request.args.get('operationName'))
+        if max_age is None:
+            response.headers['Cache-Control'] = 'private, no-store'
+            return
+        response.headers['Cache-Control'] = f'public, max-age={max_age}'
+        response.add_etag()
+        response.make_conditional(request)
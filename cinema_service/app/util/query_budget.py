@@ -0,0 +1,45 @@
+import threading
+import time
+
+THROTTLE_WINDOW_SECONDS = 60
+MAX_TRACKED_CLIENTS = 10000
+
+class QueryBudgetExceeded(Exception):
+    def __init__(self, message, status_code=400, retry_after=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+# Limits for a single operation (cost and depth) plus a per-client cost
+# allowance over a fixed window, so one client cannot keep a worker busy with
+# a stream of operations that are each just under the single-operation limit.
+class QueryBudget:
+    def __init__(self, max_cost, max_depth, cost_per_window):
+        self.max_cost = max_cost
+        self.max_depth = max_depth
+        self.cost_per_window = cost_per_window
+        self.lock = threading.Lock()
+        self.windows = {}
+
+    def charge(self, client, cost, depth):
+        if self.max_depth and depth > self.max_depth:
+            raise QueryBudgetExceeded(f"Query depth {depth} exceeds the maximum of {self.max_depth}.")
+        if self.max_cost and cost > self.max_cost:
+            raise QueryBudgetExceeded(f"Query cost {cost} exceeds the maximum of {self.max_cost}.")
+        if not self.cost_per_window:
+            return
+
+        now = time.monotonic()
+        with self.lock:
+            started, spent = self.windows.get(client, (now, 0))
+            if now - started >= THROTTLE_WINDOW_SECONDS:
+                started, spent = now, 0
+            if spent + cost > self.cost_per_window:
+                retry_after = int(THROTTLE_WINDOW_SECONDS - (now - started)) + 1
+                raise QueryBudgetExceeded("Query cost budget exhausted, retry later.", 429, retry_after)
+            self.windows[client] = (started, spent + cost)
+            if len(self.windows) > MAX_TRACKED_CLIENTS:
+                self.windows = {
+                    key: window for key, window in self.windows.items()
+                    if now - window[0] < THROTTLE_WINDOW_SECONDS
+                }
@@ -0,0 +1,27 @@
+import logging
+from flask import g, has_request_context
+from pymongo import monitoring
+
+logger = logging.getLogger(__name__)
+
+class QueryCounter(monitoring.CommandListener):
+    def started(self, event):
+        if has_request_context():
+            g.db_round_trips = g.get('db_round_trips', 0) + 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+def get_round_trips():
+    if not has_request_context():
+        return 0
+    return g.get('db_round_trips', 0)
+
+def log_round_trips(operation_name, response):
+    round_trips = get_round_trips()
+    response.headers['X-DB-Round-Trips'] = str(round_trips)
+    logger.info("GraphQL operation %s used %d DB round-trips", operation_name or '<anonymous>', round_trips)
+    return response
@@ -0,0 +1,35 @@
+# Clients join a room per cinema (schedule changes) and per showtime (seat
+# changes) and receive only small deltas, so traffic scales with the number
+# of changes rather than with the size of a cinema's schedule.
+
+def cinema_room(cinema_id):
+    return f'cinema:{cinema_id}'
+
+def showtime_room(showtime_id):
+    return f'showtime:{showtime_id}'
+
+def seat_payload(seats):
+    return [{'seatGroup': seat.seatGroup, 'row': seat.row, 'column': seat.column} for seat in seats]
+
+def showtime_payload(showtime):
+    return {
+        'id': str(showtime.id),
+        'movie_id': showtime.movie_id,
+        'day': showtime.day,
+        'start_time': showtime.start_time.isoformat(),
+        'duration': showtime.duration,
+        'price': showtime.price,
+    }
+
+def emit_to(room, event, payload):
+    from app import socketio
+    socketio.emit(event, payload, to=room)
+
+def emit_seats(event, showtime_id, seats):
+    emit_to(showtime_room(showtime_id), event, {'showtime_id': str(showtime_id), 'seats': seat_payload(seats)})
+
+def emit_showtime_added(showtime):
+    emit_to(cinema_room(showtime.cinema_id), 'showtime_added', {'cinema_id': showtime.cinema_id, 'showtime': showtime_payload(showtime)})
+
+def emit_showtimes_removed(cinema_id, showtime_ids):
+    emit_to(cinema_room(cinema_id), 'showtimes_removed', {'cinema_id': cinema_id, 'showtime_ids': [str(showtime_id) for showtime_id in showtime_ids]})
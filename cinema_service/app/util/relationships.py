@@ -0,0 +1,114 @@
+import logging
+from collections import defaultdict
+from bson import ObjectId
+from pymongo import UpdateMany, UpdateOne
+from .response_cache import invalidate
+
+logger = logging.getLogger(__name__)
+
+# Movies list their actors and actors list their movies. Every change to one
+# side is mirrored onto the other with at most one bulk_write of $addToSet and
+# $pull, so the number of round-trips does not depend on the size of the cast.
+
+def cast_models():
+    from ..models.movie import MovieModel
+    from ..models.actor import ActorModel
+    return MovieModel, ActorModel
+
+def existing_ids(model, ids, label):
+    # One $in query instead of a get() per id; unknown ids are an error, as
+    # they were when each document was loaded on its own.
+    ids = list(dict.fromkeys(str(document_id) for document_id in ids or []))
+    valid = [ObjectId(document_id) for document_id in ids if ObjectId.is_valid(document_id)]
+    found = {document['_id'] for document in model._get_collection().find({'_id': {'$in': valid}}, {'_id': 1})} if valid else set()
+    missing = [document_id for document_id in ids if not ObjectId.is_valid(document_id) or ObjectId(document_id) not in found]
+    if missing:
+        raise Exception(f"{label} not found: {', '.join(missing)}")
+    return valid
+
+def mirror(model, field, target_id, added=(), removed=()):
+    requests = []
+    if added:
+        requests.append(UpdateMany({'_id': {'$in': list(added)}}, {'$addToSet': {field: target_id}}))
+    if removed:
+        requests.append(UpdateMany({'_id': {'$in': list(removed)}}, {'$pull': {field: target_id}}))
+    if requests:
+        model._get_collection().bulk_write(requests, ordered=False)
+
+def replace(current, new):
+    current, new = set(current), set(new)
+    return new - current, current - new
+
+def set_movie_actors(movie_id, current_ids, actor_ids):
+    # Mirrors a new cast onto the actors; the caller stores `actor_ids` on the
+    # movie itself. Returns the ids of every actor whose list changed.
+    _, ActorModel = cast_models()
+    added, removed = replace(current_ids, actor_ids)
+    mirror(ActorModel, 'movies', movie_id, added, removed)
+    return added | removed
+
+def set_actor_movies(actor_id, current_ids, movie_ids):
+    MovieModel, _ = cast_models()
+    added, removed = replace(current_ids, movie_ids)
+    mirror(MovieModel, 'actors', actor_id, added, removed)
+    return added | removed
+
+def edges(model, field):
+    pipeline = [{'$unwind': f'${field}'}, {'$project': {field: 1}}]
+    return {(document['_id'], document[field]) for document in model._get_collection().aggregate(pipeline)}
+
+def repair(model, field, pairs):
+    additions, removals = defaultdict(list), defaultdict(list)
+    for document_id, value, add in pairs:
+        (additions if add else removals)[document_id].append(value)
+    requests = [UpdateOne({'_id': document_id}, {'$addToSet': {field: {'$each': values}}}) for document_id, values in additions.items()]
+    requests += [UpdateOne({'_id': document_id}, {'$pull': {field: {'$in': values}}}) for document_id, values in removals.items()]
+    if requests:
+        model._get_collection().bulk_write(requests, ordered=False)
+
+def movie_links(movie_ids):
+    MovieModel, _ = cast_models()
+    documents = MovieModel._get_collection().find({'_id': {'$in': list(movie_ids)}}, {'actors': 1})
+    return {(document['_id'], actor_id) for document in documents for actor_id in document.get('actors') or []}
+
+def reconcile_cast():
+    # Rebuilds `actors.movies` from `movies.actors`, the source of truth: an
+    # actor missing a movie that lists them gets it back, an actor listing a
+    # movie that does not list them loses it, and a movie listing a deleted
+    # actor drops them. The movies involved are read again right before the
+    # repair, so a link an edit has changed since the scan is left alone.
+    # Meant to run periodically, it catches drift left by writes that failed
+    # half way or predate the bulk updates.
+    MovieModel, ActorModel = cast_models()
+    actor_ids = {document['_id'] for document in ActorModel._get_collection().find({}, {'_id': 1})}
+    movie_side = edges(MovieModel, 'actors')
+    actor_side = {(movie_id, actor_id) for actor_id, movie_id in edges(ActorModel, 'movies')}
+    missing, stale = movie_side - actor_side, actor_side - movie_side
+    current = movie_links({movie_id for movie_id, _ in missing | stale})
+
+    movie_repairs, actor_repairs = [], []
+    for movie_id, actor_id in missing & current:
+        if actor_id in actor_ids:
+            actor_repairs.append((actor_id, movie_id, True))
+        else:
+            movie_repairs.append((movie_id, actor_id, False))
+    for movie_id, actor_id in stale - current:
+        actor_repairs.append((actor_id, movie_id, False))
+
+    repair(MovieModel, 'actors', movie_repairs)
+    repair(ActorModel, 'movies', actor_repairs)
+    repaired = len(movie_repairs) + len(actor_repairs)
+    if repaired:
+        logger.warning("Repaired %d movie/actor links", repaired)
+        invalidate('movies', 'actors',
+                   *(f'movie:{movie_id}' for movie_id, _, _ in movie_repairs),
+                   *(f'actor:{actor_id}' for actor_id, _, _ in actor_repairs))
+    return repaired
+
+if __name__ == '__main__':
+    import os
+    from dotenv import load_dotenv
+    from mongoengine import connect
+    load_dotenv()
+    connect(db='cinemacollection', host=os.environ.get('MONGO_URI'), alias='default')
+    print(f"Repaired {reconcile_cast()} movie/actor links")
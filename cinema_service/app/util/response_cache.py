@@ -0,0 +1,205 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from flask import g, has_request_context
+from graphql.language.ast import Variable
+from graphql.language.printer import print_ast
+from .hot_documents import forget_tags
+
+RESPONSE_CACHE_SIZE = 1024
+RESPONSE_CACHE_SECONDS = 300
+KEY_PREFIX = 'graphql-response:'
+TAG_PREFIX = 'graphql-tag:'
+
+# Root query fields whose results may be cached, and the tags each result is
+# filed under. Mutations bump the version of the tags they touch, and a cached
+# result is only served while all of its tags still have the versions they had
+# when it was stored, so an invalidation can never be lost to a slow writer.
+ROOT_FIELD_TAGS = {
+    'fetchMovie': lambda args: [f"movie:{args.get('movieId')}"],
+    'allMoviesPage': lambda args: ['movies'],
+    'searchMoviesPage': lambda args: ['movies'],
+    'moviesPage': lambda args: ['movies'],
+    'allMoviesConnection': lambda args: ['movies'],
+    'searchMoviesConnection': lambda args: ['movies'],
+    'movieCount': lambda args: ['movies'],
+    'searchMovieCount': lambda args: ['movies'],
+    'fetchCinema': lambda args: [f"cinema:{args.get('cinemaId')}"],
+    'allCinemas': lambda args: ['cinemas'],
+    'searchCinemas': lambda args: ['cinemas'],
+    'cinemasPage': lambda args: ['cinemas'],
+    'allCinemasConnection': lambda args: ['cinemas'],
+    'searchCinemasConnection': lambda args: ['cinemas'],
+    'cinemaCount': lambda args: ['cinemas'],
+    'searchCinemaCount': lambda args: ['cinemas'],
+    'fetchActor': lambda args: [f"actor:{args.get('actorId')}"],
+    'allActors': lambda args: ['actors'],
+    'actorsPage': lambda args: ['actors'],
+    'allActorsConnection': lambda args: ['actors'],
+    'actorsCount': lambda args: ['actors'],
+    'searchActorsCount': lambda args: ['actors'],
+    'moviesByActor': lambda args: [f"actor:{args.get('actorId')}", 'movies'],
+    'searchMoviesByActor': lambda args: [f"actor:{args.get('actorId')}", 'movies'],
+    'movieActorCount': lambda args: [f"actor:{args.get('actorId')}", 'movies'],
+    'searchMovieActorCount': lambda args: [f"actor:{args.get('actorId')}", 'movies'],
+    'schedules': lambda args: [f"schedule:{args.get('cinemaId')}"],
+    'scheduleItem': lambda args: [f"schedule:{args.get('cinemaId')}"],
+}
+
+class LocalBackend:
+    def __init__(self, max_size=RESPONSE_CACHE_SIZE):
+        self.max_size = max_size
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.versions = {}
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, seconds):
+        with self.lock:
+            self.entries[key] = (value, time.monotonic() + seconds)
+            self.entries.move_to_end(key)
+            if len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def tag_versions(self, tags):
+        with self.lock:
+            return [self.versions.get(tag, 0) for tag in tags]
+
+    def bump(self, tags):
+        with self.lock:
+            for tag in tags:
+                self.versions[tag] = self.versions.get(tag, 0) + 1
+
+class RedisBackend:
+    def __init__(self, url):
+        import redis
+        self.client = redis.Redis.from_url(url)
+
+    def get(self, key):
+        value = self.client.get(KEY_PREFIX + key)
+        return value.decode() if value is not None else None
+
+    def set(self, key, value, seconds):
+        self.client.setex(KEY_PREFIX + key, seconds, value)
+
+    def tag_versions(self, tags):
+        if not tags:
+            return []
+        return [int(version or 0) for version in self.client.mget([TAG_PREFIX + tag for tag in tags])]
+
+    def bump(self, tags):
+        pipeline = self.client.pipeline(transaction=False)
+        for tag in tags:
+            pipeline.incr(TAG_PREFIX + tag)
+        pipeline.execute()
+
+class ResponseCache:
+    def __init__(self, backend, seconds=RESPONSE_CACHE_SECONDS):
+        self.backend = backend
+        self.seconds = seconds
+        self.lock = threading.Lock()
+        self.counters = {'hits': 0, 'misses': 0, 'stale': 0, 'stores': 0, 'invalidations': 0}
+
+    def count(self, name):
+        with self.lock:
+            self.counters[name] += 1
+
+    def get(self, key):
+        value = self.backend.get(key)
+        if value is None:
+            self.count('misses')
+            return None
+        entry = json.loads(value)
+        tags = list(entry['tags'])
+        if self.backend.tag_versions(tags) != [entry['tags'][tag] for tag in tags]:
+            self.count('stale')
+            self.count('misses')
+            return None
+        self.count('hits')
+        return entry['body']
+
+    def versions(self, tags):
+        tags = sorted(set(tags))
+        return dict(zip(tags, self.backend.tag_versions(tags)))
+
+    def set(self, key, body, versions):
+        self.backend.set(key, json.dumps({'tags': versions, 'body': body}), self.seconds)
+        self.count('stores')
+
+    def invalidate(self, *tags):
+        if tags:
+            self.backend.bump(tags)
+            self.count('invalidations')
+
+    def stats(self):
+        with self.lock:
+            counters = dict(self.counters)
+        lookups = counters['hits'] + counters['misses']
+        counters['hit_rate'] = round(counters['hits'] / lookups, 3) if lookups else 0.0
+        return counters
+
+# RESPONSE_CACHE_URL picks the backend: redis://... shares cached results and
+# tag versions between every worker and replica; memory:// (or unset) keeps
+# them in this process, where invalidations from other processes are only
+# picked up once entries expire.
+response_cache = ResponseCache(LocalBackend())
+
+def configure_response_cache(url, seconds=RESPONSE_CACHE_SECONDS):
+    global response_cache
+    backend = RedisBackend(url) if url and not url.startswith('memory://') else LocalBackend()
+    response_cache = ResponseCache(backend, seconds)
+    return response_cache
+
+def get_response_cache():
+    return response_cache
+
+def invalidate(*tags):
+    from ..schemas.pagination import forget_counts
+    forget_tags(tags)
+    forget_counts(tags)
+    response_cache.invalidate(*tags)
+
+def tag(*tags):
+    # Lets a resolver file the current result under tags that depend on its
+    # arguments or on ids it has looked up, e.g. the showtime behind a
+    # scheduleItem. Each tag's version is recorded here, so resolvers call this
+    # before reading the data the tag covers: a write landing after that read
+    # then leaves the stored result stale instead of current. Only done while
+    # a result is about to be cached.
+    if has_request_context() and 'cache_tags' in g:
+        new_tags = set(tags) - g.cache_tags.keys()
+        if new_tags:
+            g.cache_tags.update(response_cache.versions(new_tags))
+
+def argument_values(field, variables):
+    values = {}
+    for argument in field.arguments or []:
+        value = argument.value
+        values[argument.name.value] = variables.get(value.name.value) if isinstance(value, Variable) else getattr(value, 'value', None)
+    return values
+
+def cache_tags(operation, variables):
+    tags = []
+    for selection in operation.selection_set.selections:
+        name = getattr(selection, 'name', None)
+        if name is None or name.value not in ROOT_FIELD_TAGS:
+            return None
+        tags.extend(ROOT_FIELD_TAGS[name.value](argument_values(selection, variables)))
+    return tags or None
+
+def cache_key(document_ast, operation_name, variables):
+    normalized = json.dumps([print_ast(document_ast), operation_name, variables], sort_keys=True, default=str)
+    return hashlib.sha256(normalized.encode()).hexdigest()
@@ -1,24 +1,38 @@
-from datetime import timedelta, datetime
-from ..models.schedule import Schedule
+import logging
+import time
+from datetime import datetime
+from ..models.showtime import Showtime
+from .realtime import emit_showtimes_removed
+from .response_cache import invalidate
+from .relationships import reconcile_cast
 from apscheduler.schedulers.background import BackgroundScheduler
 
+logger = logging.getLogger(__name__)
+
 def remove_expired_schedule_items():
-    from app import socketio
-    current_time = datetime.now()
-    for schedule in Schedule.objects:
-        for schedule_day in schedule.schedule_days:
-            new_items = [
-                item for item in schedule_day.schedule_items
-                if current_time < item.start_time + timedelta(minutes=item.duration + 30)
-            ]
-            if len(new_items) != len(schedule_day.schedule_items):
-                schedule_day.schedule_items = new_items
-                schedule.save() 
-                socketio.emit('schedule_update', {'cinema_id': schedule.cinema_id, 'schedule_days': schedule.schedule_days})
+    # Only showtimes past their end time are touched: the end_time index turns
+    # both the grouping and the delete into range scans, however many cinemas
+    # and future showtimes there are.
+    started = time.perf_counter()
+    query = {'end_time': {'$lte': datetime.now()}}
+    collection = Showtime._get_collection()
+    expired = list(collection.aggregate([
+        {'$match': query},
+        {'$group': {'_id': '$cinema_id', 'showtime_ids': {'$push': '$_id'}}},
+    ]))
+    pruned = collection.delete_many(query).deleted_count if expired else 0
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    logger.info("Pruned %d expired showtimes from %d cinemas in %.1f ms", pruned, len(expired), elapsed_ms)
+    if expired:
+        invalidate(*(f"schedule:{group['_id']}" for group in expired))
+    for group in expired:
+        emit_showtimes_removed(group['_id'], group['showtime_ids'])
+    return pruned, elapsed_ms
 
 
 scheduler = BackgroundScheduler()
 scheduler.add_job(remove_expired_schedule_items, 'interval', minutes=10)
+scheduler.add_job(reconcile_cast, 'interval', hours=1)
 
 def start_scheduler():
-    scheduler.start()
\ No newline at end of file
+    scheduler.start()
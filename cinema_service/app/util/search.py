@@ -0,0 +1,64 @@
+import re
+from pymongo import UpdateOne
+
+MAX_PREFIX_LENGTH = 20
+TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+# Every searchable model keeps a `search_keywords` list with the edge n-grams
+# (all prefixes) of its searchable words, under a text index with stemming
+# disabled. $text finds the documents holding any query term through that
+# index and ranks them by textScore; $all then keeps only those holding every
+# term. A search for "incep" is an index lookup on the keyword "incep" instead
+# of a collection-wide regex scan.
+SEARCH_INDEXES = [
+    {'fields': ['$search_keywords'], 'default_language': 'none'},
+]
+
+def tokenize(text):
+    return [token[:MAX_PREFIX_LENGTH] for token in TOKEN_PATTERN.findall((text or '').lower())]
+
+def build_keywords(*texts):
+    keywords = set()
+    for text in texts:
+        for token in tokenize(text):
+            keywords.update(token[:length] for length in range(1, len(token) + 1))
+    return sorted(keywords)
+
+def search(queryset, query):
+    terms = list(dict.fromkeys(tokenize(query)))
+    if not terms:
+        return queryset.none()
+    return queryset.filter(search_keywords__all=terms).search_text(' '.join(terms)).order_by('$text_score')
+
+def reindex(model, *field_names):
+    # Backfills search_keywords for documents written before the field existed.
+    collection = model._get_collection()
+    db_fields = [model._fields[name].db_field for name in field_names]
+    requests = [
+        UpdateOne({'_id': document['_id']}, {'$set': {'search_keywords': build_keywords(*(document.get(field) for field in db_fields))}})
+        for document in collection.find({}, {field: 1 for field in db_fields})
+    ]
+    if requests:
+        collection.bulk_write(requests, ordered=False)
+    return len(requests)
+
+def reindex_all():
+    from ..models.movie import MovieModel
+    from ..models.actor import ActorModel
+    from ..models.cinema import CinemaModel
+    from ..models.user import UserModel
+    return {
+        'movies': reindex(MovieModel, *MovieModel.search_fields),
+        'actors': reindex(ActorModel, *ActorModel.search_fields),
+        'cinemas': reindex(CinemaModel, *CinemaModel.search_fields),
+        'users': reindex(UserModel, *UserModel.search_fields),
+    }
+
+if __name__ == '__main__':
+    import os
+    from dotenv import load_dotenv
+    from mongoengine import connect
+    load_dotenv()
+    connect(db='cinemacollection', host=os.environ.get('MONGO_URI'), alias='default')
+    for collection, count in reindex_all().items():
+        print(f"Reindexed {count} {collection}")
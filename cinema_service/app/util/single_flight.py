@@ -0,0 +1,77 @@
+import threading
+
+SINGLE_FLIGHT_TIMEOUT_SECONDS = 10
+DEFAULT_SINGLE_FLIGHT = ('graphql', 'movies', 'cinemas', 'scheduleItem', 'schedules')
+
+class Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+# Collapses identical concurrent calls in this process: the first caller for a
+# key runs the function, everyone arriving while it runs waits and gets the
+# same result (or exception). Nothing is kept once the call returns, so this
+# never serves stale data; it only stops a burst of identical reads from
+# turning into a burst of identical Mongo queries.
+class SingleFlight:
+    def __init__(self, names=DEFAULT_SINGLE_FLIGHT):
+        self.names = set(names)
+        self.lock = threading.Lock()
+        self.calls = {}
+        self.counters = {}
+
+    def count(self, name, counter):
+        counters = self.counters.setdefault(name, {'calls': 0, 'executions': 0, 'collapsed': 0})
+        counters[counter] += 1
+
+    def do(self, name, key, function):
+        if name not in self.names:
+            return function()
+        key = (name, key)
+        with self.lock:
+            self.count(name, 'calls')
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = Call()
+                self.count(name, 'executions')
+
+        if not leader:
+            if not call.done.wait(SINGLE_FLIGHT_TIMEOUT_SECONDS):
+                with self.lock:
+                    self.count(name, 'executions')
+                return function()
+            with self.lock:
+                self.count(name, 'collapsed')
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = function()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.done.set()
+
+    def stats(self):
+        with self.lock:
+            return {name: dict(counters) for name, counters in self.counters.items()}
+
+single_flight = SingleFlight()
+
+def configure_single_flight(names):
+    global single_flight
+    single_flight = SingleFlight(names)
+    return single_flight
+
+def coalesce(name, key, function):
+    return single_flight.do(name, key, function)
+
+def single_flight_stats():
+    return single_flight.stats()
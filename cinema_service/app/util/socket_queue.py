@@ -0,0 +1,49 @@
+import queue
+import threading
+from socketio import PubSubManager
+
+# Every process of every replica owns its own Socket.IO clients, so emits go
+# through a pub/sub channel that all processes listen on. SOCKETIO_MESSAGE_QUEUE
+# picks the backend: a broker URL (redis://, amqp://, kafka://) in production,
+# or memory:// to fan out between servers living in the same process, e.g. in
+# tests. Left unset, emits only reach clients of the emitting process.
+
+class InProcessBroker:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscribers = {}
+
+    def subscribe(self, channel):
+        subscriber = queue.Queue()
+        with self.lock:
+            self.subscribers.setdefault(channel, []).append(subscriber)
+        return subscriber
+
+    def publish(self, channel, message):
+        with self.lock:
+            subscribers = list(self.subscribers.get(channel, []))
+        for subscriber in subscribers:
+            subscriber.put(message)
+
+broker = InProcessBroker()
+
+class InProcessManager(PubSubManager):
+    name = 'memory'
+
+    def __init__(self, channel='flask-socketio', write_only=False, logger=None):
+        super().__init__(channel=channel, write_only=write_only, logger=logger)
+        self.subscriber = None if write_only else broker.subscribe(channel)
+
+    def _publish(self, data):
+        broker.publish(self.channel, data)
+
+    def _listen(self):
+        while True:
+            yield self.subscriber.get()
+
+def socketio_options(url):
+    if not url:
+        return {}
+    if url.startswith('memory://'):
+        return {'client_manager': InProcessManager(channel=url[len('memory://'):] or 'flask-socketio')}
+    return {'message_queue': url}
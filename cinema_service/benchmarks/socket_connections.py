@@ -0,0 +1,52 @@
+import argparse
+import asyncio
+import time
+import socketio
+
+# Opens N idle Socket.IO clients against a running cinema-service, holds them
+# for a while and reports how many connected, how long that took and how many
+# were still connected at the end. See BENCHMARK.md.
+
+async def connect_client(url, path, transports, timeout):
+    client = socketio.AsyncClient(reconnection=False)
+    try:
+        await asyncio.wait_for(client.connect(url, socketio_path=path, transports=transports, wait_timeout=timeout), timeout)
+        await client.emit('subscribe', {'cinema_id': 'benchmark'})
+        return client
+    except Exception:
+        await client.disconnect()
+        return None
+
+async def run(url, path, clients, batch, hold, transports, timeout):
+    started = time.perf_counter()
+    connected = []
+    for offset in range(0, clients, batch):
+        results = await asyncio.gather(*(
+            connect_client(url, path, transports, timeout) for _ in range(min(batch, clients - offset))
+        ))
+        connected.extend(client for client in results if client)
+    connect_seconds = time.perf_counter() - started
+
+    await asyncio.sleep(hold)
+    alive = sum(1 for client in connected if client.connected)
+    await asyncio.gather(*(client.disconnect() for client in connected), return_exceptions=True)
+    return {
+        'requested': clients,
+        'connected': len(connected),
+        'alive_after_hold': alive,
+        'connect_seconds': round(connect_seconds, 2),
+    }
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--url', default='http://localhost:4000')
+    parser.add_argument('--path', default='socket.io')
+    parser.add_argument('--clients', type=int, default=1000)
+    parser.add_argument('--batch', type=int, default=100)
+    parser.add_argument('--hold', type=float, default=30)
+    parser.add_argument('--timeout', type=float, default=10)
+    parser.add_argument('--transport', default='websocket', choices=['websocket', 'polling'])
+    args = parser.parse_args()
+    result = asyncio.run(run(args.url, args.path, args.clients, args.batch, args.hold, [args.transport], args.timeout))
+    for key, value in result.items():
+        print(f"{key}: {value}")
@@ -1,3 +1,13 @@
+import os
+
+# Under gevent every blocking call (pymongo sockets, requests, SMTP, Cloudinary
+# uploads) must yield to the hub, so the stdlib is patched before anything else
+# is imported. gunicorn's gevent workers patch on their own; this covers
+# `python wsgi.py`.
+if os.environ.get('SOCKETIO_ASYNC_MODE') == 'gevent':
+    from gevent import monkey
+    monkey.patch_all()
+
 from app import create_app
 
 app, mail, socketio, csrf = create_app()
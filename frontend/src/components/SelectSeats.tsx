@@ -7,6 +7,7 @@ import DurationFormat from '../lib/DurationFormat';
 import FormatDateTime from '../lib/FormatDateTime'
 import client from '../lib/apollo-client';
 import { RotateLoader } from 'react-spinners';
+import { useSession } from 'next-auth/react';
 
 interface QueryProps{
     title:string;
@@ -48,10 +49,11 @@ const GET_SCHEDULE_ITEM = gql`
         }
     }
 `;
-const CHECK_SEATS_AVAILABILITY = gql`
-    mutation CheckSeatsAvailability($cinemaId: String!, $movieId: String!, $scheduleDay: String!, $startTime: String!, $seats: [SeatInputType!]!) {
-        checkSeatsAvailability(cinemaId: $cinemaId, movieId: $movieId, scheduleDay: $scheduleDay, startTime: $startTime, seats: $seats) {
-            areSeatsTaken
+const HOLD_SEATS = gql`
+    mutation HoldSeats($cinemaId: String!, $movieId: String!, $scheduleDay: String!, $startTime: String!, $seats: [SeatInputType!]!, $userId: String!) {
+        holdSeats(cinemaId: $cinemaId, movieId: $movieId, scheduleDay: $scheduleDay, startTime: $startTime, seats: $seats, userId: $userId) {
+            ok
+            expiresAt
         }
     }
 `;
@@ -61,6 +63,7 @@ const SelectSeats = () => {
     const { id } = router.query;
     const { title, poster_url, start_time, movie_id, day } = router.query as unknown as QueryProps;
     const [selectedSeats, setSelectedSeats] = useState<SeatType[]>([]);
+    const { data: session } = useSession();
     const { data, loading, error } = useQuery(GET_SCHEDULE_ITEM, {
         variables: { cinema_id: id, movie_id: movie_id, start_time: start_time, day: day },
     });
@@ -107,15 +110,22 @@ const SelectSeats = () => {
             return;
         }
 
+        if (!session?.id) {
+            alert('Please sign in to select seats.');
+            router.push(`/api/auth/signin?callbackUrl=${encodeURIComponent(router.asPath)}`);
+            return;
+        }
+
         try {
-            const { data:dataSeatAvailability, errors } = await client.mutate({
-                mutation: CHECK_SEATS_AVAILABILITY,
+            const { data:dataSeatHold, errors } = await client.mutate({
+                mutation: HOLD_SEATS,
                 variables: {
                     cinemaId: id,
                     scheduleDay: day,
                     movieId: movie_id,
                     startTime: data.scheduleItem.startTime,
-                    seats: selectedSeatDetails
+                    seats: selectedSeatDetails,
+                    userId: session.id
                 }
             });
 
@@ -126,7 +136,7 @@ const SelectSeats = () => {
             }
     
     
-            if (dataSeatAvailability.checkSeatsAvailability.areSeatsTaken) {
+            if (!dataSeatHold.holdSeats.ok) {
                 alert('Some of the selected seats are no longer available. Please select other seats.');
                 return;
             }
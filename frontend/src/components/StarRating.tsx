@@ -11,10 +11,10 @@ const RATE_MOVIE = gql`
   }
 `;
 const FETCH_MOVIE = gql`
-  query fetchMovie($movie_id: String!) {
+  query fetchMovie($movie_id: String!, $user_id: String!) {
     fetchMovie(movieId: $movie_id) {
       id
-      ratedBy
+      ratedBy(userId: $user_id)
       rating
     }
   }
@@ -23,17 +23,17 @@ const FETCH_MOVIE = gql`
 interface StarProps{
   movieId: string,
   userId: string | undefined,
-  ratedBy: [string];
 }
 
-const StarRating = ({ movieId, userId, ratedBy }:StarProps) => {
+const StarRating = ({ movieId, userId }:StarProps) => {
   const [hover, setHover] = useState<number | null>(null);
   const [rating, setRating] = useState(0);
   const [rated, setRated] = useState<boolean>(false);
   const [rateMovie] = useMutation(RATE_MOVIE);
   const { loading, error, data } = useQuery(FETCH_MOVIE, {  
     variables: {
-      movie_id: movieId
+      movie_id: movieId,
+      user_id: userId ?? ''
     } 
   })
   if (loading) return (
@@ -51,7 +51,7 @@ const StarRating = ({ movieId, userId, ratedBy }:StarProps) => {
 
   const handleRating = async (newRating:number) => {
     if(userId){
-      const currentUserRated = ratedBy.includes(userId);
+      const currentUserRated = data.fetchMovie.ratedBy;
       setRated(currentUserRated);
       if (rated) {
         console.log("You have already rated this movie.");
@@ -77,7 +77,7 @@ const StarRating = ({ movieId, userId, ratedBy }:StarProps) => {
     }
   };
 
-  const isUserRated = data && data.fetchMovie && data.fetchMovie.ratedBy.includes(userId);
+  const isUserRated = data && data.fetchMovie && data.fetchMovie.ratedBy;
   return (
     <div className="inline-flex w-auto">
       {isUserRated ? (
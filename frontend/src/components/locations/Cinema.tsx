@@ -10,14 +10,14 @@ interface WorkingDayType {
   endTime: string;
 }
 const FETCH_CINEMA = gql`
-  query findCinema($cinema_id: String!) {
+  query findCinema($cinema_id: String!, $user_id: String!) {
     fetchCinema(cinemaId: $cinema_id) {
       id
       name
       location
       rating
       imageUrl
-      ratedBy
+      ratedBy(userId: $user_id)
       workingDays {
         day
         startTime
@@ -41,10 +41,11 @@ const Cinema: React.FC<{ id: string }> = ({ id }) => {
   const { data, error, loading, refetch } = useQuery(FETCH_CINEMA, {
     variables: {
       cinema_id: id,
+      user_id: session?.id ?? '',
     },
     onCompleted: (data) => {
       if (session?.id) {
-        const userHasRated = data?.fetchCinema.ratedBy.includes(session.id);
+        const userHasRated = data?.fetchCinema.ratedBy;
         setRated(userHasRated);
       }
     }
@@ -55,7 +56,7 @@ const Cinema: React.FC<{ id: string }> = ({ id }) => {
   const handleRatingChange = async (newRating: number) => {
     if(session?.id){
       if (data && data.fetchCinema) {
-        const currentUserRated = data.fetchCinema.ratedBy.includes(session?.id);
+        const currentUserRated = data.fetchCinema.ratedBy;
         setRated(currentUserRated);
 
         if (rated) {
@@ -26,8 +26,10 @@ const ADD_COMMENT = gql`
   }
 `;
 
+const COMMENTS_PAGE_SIZE = 10;
+
 const GET_MOVIE_BY_ID = gql`
-  query GetMovieById($id: String!) {
+  query GetMovieById($id: String!, $first: Int, $after: String) {
     fetchMovie(movieId: $id) {
       id
       title
@@ -36,12 +38,19 @@ const GET_MOVIE_BY_ID = gql`
       posterUrl
       videoUrl
       description
-      ratedBy
       rating
-      comments {
-        username
-        content
-        timestamp
+      comments(first: $first, after: $after) {
+        edges {
+          node {
+            username
+            content
+            timestamp
+          }
+        }
+        pageInfo {
+          hasNextPage
+          endCursor
+        }
       }
       actors {
         id
@@ -56,10 +65,11 @@ const MovieDetail = () => {
   const { id } = router.query;
   const { data: session, status } = useSession();
   const [content, setContent] = useState('');
-  const [visibleComments, setVisibleComments] = useState(10);
+  const [moreComments, setMoreComments] = useState<CommentType[]>([]);
+  const [commentsPage, setCommentsPage] = useState<{ hasNextPage: boolean; endCursor: string | null } | null>(null);
 
-  const { loading, error, data } = useQuery(GET_MOVIE_BY_ID, {
-    variables: { id },
+  const { loading, error, data, fetchMore, refetch } = useQuery(GET_MOVIE_BY_ID, {
+    variables: { id, first: COMMENTS_PAGE_SIZE },
     skip: !id,
   });
   const [addComment] = useMutation(ADD_COMMENT);
@@ -92,6 +102,9 @@ const MovieDetail = () => {
                 },
             });
             setContent('');
+            setMoreComments([]);
+            setCommentsPage(null);
+            await refetch();
         } catch (error) {
             console.error("Error adding comment:", error);
         }
@@ -100,8 +113,20 @@ const MovieDetail = () => {
     }
   };
 
-  const showMoreComments = () => {
-    setVisibleComments((prev) => prev + 10);
+  const pageInfo = commentsPage ?? movie.comments.pageInfo;
+  const comments: CommentType[] = [
+    ...movie.comments.edges.map((edge: { node: CommentType }) => edge.node),
+    ...moreComments,
+  ];
+
+  const showMoreComments = async () => {
+    const { data: more } = await fetchMore({
+      variables: { id, first: COMMENTS_PAGE_SIZE, after: pageInfo.endCursor },
+      updateQuery: (previous) => previous,
+    });
+    const page = more.fetchMovie.comments;
+    setMoreComments((previous) => [...previous, ...page.edges.map((edge: { node: CommentType }) => edge.node)]);
+    setCommentsPage(page.pageInfo);
   };
 
   return (
@@ -125,7 +150,7 @@ const MovieDetail = () => {
           </p>
           <p className="dark:text-white">{movie.description}</p>
           {session &&
-          <RatingComponent movieId={`${id}`} movieRating={movie.rating} movieRatedBy={movie.ratedBy} />
+          <RatingComponent movieId={`${id}`} movieRating={movie.rating} />
           }
           {movie.actors.length === 0 ? (
             <p className='dark:text-white my-5'>No actors.</p>
@@ -148,12 +173,12 @@ const MovieDetail = () => {
       </div>
       <hr className="h-px my-8 bg-red-200 border-0 dark:bg-red-700"/>
       <div>
-        {movie.comments.length === 0 ? (
+        {comments.length === 0 ? (
           <p className='dark:text-white my-5'>No comments yet.</p>
         ) : (
           <>
             <ul className="my-5">
-              {movie.comments.slice().reverse().slice(0, visibleComments).map((comment: CommentType, index: number) => (
+              {comments.map((comment: CommentType, index: number) => (
                 <li key={index} className="dark:text-white">
                   <strong className="dark:text-white">{comment.username}</strong>: {comment.content}
                   <br />
@@ -161,7 +186,7 @@ const MovieDetail = () => {
                 </li>
               ))}
             </ul>
-            {visibleComments < movie.comments.length && (
+            {pageInfo.hasNextPage && (
               <a
                 onClick={showMoreComments}
                 className="text-blue-500 hover:text-blue-700 dark:text-red-500 dark:hover:text-red-600 font-bold my-2 rounded"
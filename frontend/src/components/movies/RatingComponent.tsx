@@ -7,15 +7,14 @@ import StarRating from '../StarRating';
 interface RatingProps {
     movieId: string;
     movieRating: number;
-    movieRatedBy: [string];
 }
 
-const RatingComponent = ({ movieId,movieRating,movieRatedBy }:RatingProps) => {
+const RatingComponent = ({ movieId,movieRating }:RatingProps) => {
     const { data: session } = useSession();
     return (
       <div className="my-5">
         <div className="flex items-center gap-5">
-          <StarRating movieId={movieId} userId={session?.id} ratedBy={movieRatedBy} />
+          <StarRating movieId={movieId} userId={session?.id} />
           <p className="dark:text-white">{movieRating}</p>
         </div>
       </div>
@@ -1,4 +1,4 @@
-import React from 'react';
+import React, { useEffect, useRef } from 'react';
 import { useRouter } from 'next/router';
 import { gql, useMutation, useQuery } from '@apollo/client';
 import { PayPalButtons } from '@paypal/react-paypal-js';
@@ -41,6 +41,27 @@ const BOOK_SEATS = gql`
     }
 `;
 
+const EXTEND_SEAT_HOLD = gql`
+    mutation ExtendSeatHold($cinemaId: String!, $movieId: String!, $scheduleDay: String!, $startTime: String!, $userId: String!) {
+        extendSeatHold(cinemaId: $cinemaId, movieId: $movieId, scheduleDay: $scheduleDay, startTime: $startTime, userId: $userId) {
+            ok
+            expiresAt
+        }
+    }
+`;
+
+const RELEASE_SEATS = gql`
+    mutation ReleaseSeats($cinemaId: String!, $movieId: String!, $scheduleDay: String!, $startTime: String!, $userId: String!, $seats: [SeatInputType]) {
+        releaseSeats(cinemaId: $cinemaId, movieId: $movieId, scheduleDay: $scheduleDay, startTime: $startTime, userId: $userId, seats: $seats) {
+            released
+        }
+    }
+`;
+
+// Seats are held for 10 minutes; the hold is renewed well before that while
+// the payment page is open.
+const EXTEND_HOLD_MS = 4 * 60 * 1000;
+
 const Payment = () => {
     const router = useRouter();
     const { movieId, cinemaId, totalPrice, day  } = router.query;
@@ -52,6 +73,44 @@ const Payment = () => {
     const { data:dataMovie, loading:loadingMovie } = useQuery(GET_MOVIE_BY_ID, { variables: { id: movieId} })
     const { data:dataCinema, loading:loadingCinema } = useQuery(FETCH_CINEMA, { variables: { cinema_id: cinemaId} })
     const [bookSeats] = useMutation(BOOK_SEATS);
+    const [extendSeatHold] = useMutation(EXTEND_SEAT_HOLD);
+    const [releaseSeats] = useMutation(RELEASE_SEATS);
+    const booked = useRef(false);
+
+    useEffect(() => {
+        const userId = session?.id;
+        if (!userId || !cinemaId || !movieId || !day || !date || !seatsQuery) return;
+        const hold = { cinemaId, movieId, scheduleDay: day, startTime: date, userId };
+
+        const interval = setInterval(async () => {
+            try {
+                const { data } = await extendSeatHold({ variables: hold });
+                if (!data.extendSeatHold.ok) {
+                    clearInterval(interval);
+                    alert('Your seat hold has expired. Please select your seats again.');
+                }
+            } catch (error) {
+                console.error('Error extending seat hold:', error);
+            }
+        }, EXTEND_HOLD_MS);
+
+        // Navigating away without booking, e.g. going back to change seats,
+        // gives the seats back instead of keeping them until the hold expires.
+        // Done on route change rather than unmount, which strict mode also
+        // simulates in development.
+        const handleRouteChange = () => {
+            if (!booked.current) {
+                releaseSeats({ variables: { ...hold, seats: JSON.parse(seatsQuery) } })
+                    .catch((error) => console.error('Error releasing seats:', error));
+            }
+        };
+        router.events.on('routeChangeStart', handleRouteChange);
+
+        return () => {
+            clearInterval(interval);
+            router.events.off('routeChangeStart', handleRouteChange);
+        };
+    }, [session?.id, cinemaId, movieId, day, date, seatsQuery, extendSeatHold, releaseSeats, router.events]);
 
     const totalPriceString: string = Array.isArray(totalPrice) ? totalPrice[0] : (totalPrice || '0');
     const currencyCode: string = 'USD';
@@ -70,6 +129,7 @@ const Payment = () => {
                 }
             });
             if (data.bookSeats.success) {
+                booked.current = true;
                 router.push({
                     pathname: '/success',
                     query: {
@@ -1,11 +1,24 @@
 import { ApolloClient, InMemoryCache, createHttpLink } from '@apollo/client';
+import { createPersistedQueryLink } from '@apollo/client/link/persisted-queries';
+
+const sha256 = async (query: string) => {
+  const digest = await crypto.subtle.digest('SHA-256', new TextEncoder().encode(query));
+  return Array.from(new Uint8Array(digest))
+    .map((byte) => byte.toString(16).padStart(2, '0'))
+    .join('');
+};
 
 const httpLink = createHttpLink({
   uri: 'http://localhost:8000/cinema-service/graphql',
 });
 
+const persistedQueryLink = createPersistedQueryLink({
+  sha256,
+  useGETForHashedQueries: true,
+});
+
 const client = new ApolloClient({
-  link: httpLink,
+  link: persistedQueryLink.concat(httpLink),
   cache: new InMemoryCache(),
 });
 